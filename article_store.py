@@ -0,0 +1,184 @@
+import json
+import math
+import os
+import sqlite3
+import time
+from datetime import date, datetime
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+TRACKING_PARAMS = ("utm_", "gclid", "fbclid", "mc_cid", "mc_eid")
+# DataFrame / record keys that map onto the article columns; everything else goes to `extra`
+FIELDS = {
+    "url": ("link", "url"),
+    "title": ("title",),
+    "description": ("desc", "description"),
+    "content": ("content", "text"),
+    "category": ("category", "pwcContentType"),
+    "date": ("date",),
+}
+COLUMNS = ("source", "title", "description", "content", "category", "date", "extra")
+
+
+def canonical_url(url):
+    """Lowercases scheme and host, drops the fragment, tracking parameters and a trailing slash, and sorts the query."""
+    parts = urlsplit(url.strip())
+    query = sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if not k.lower().startswith(TRACKING_PARAMS))
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, urlencode(query), ""))
+
+
+def plain(value):
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return None
+    if isinstance(value, (datetime, date)):
+        # pandas.Timestamp subclasses datetime; NaT fails the isoformat round-trip
+        return None if value != value else value.isoformat()
+    return value
+
+
+class ArticleStore:
+    """
+    Embedded SQLite store for listing records and article bodies, keyed by canonical URL.
+
+    `upsert` writes in batched transactions; a record for a known URL only fills in the
+    fields it has, so a listing row and the body fetched later end up in one article. The
+    database runs in WAL mode so readers are not blocked by a writing scraper. An FTS5 index
+    over title, description and content is kept current by triggers and queried with
+    `search`.
+    """
+
+    def __init__(self, path="articles.sqlite"):
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.db = sqlite3.connect(path)
+        self.db.row_factory = sqlite3.Row
+        self.db.execute("PRAGMA journal_mode = WAL")
+        self.db.execute("PRAGMA synchronous = NORMAL")
+        self.db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS articles (
+                id INTEGER PRIMARY KEY,
+                url TEXT NOT NULL UNIQUE,
+                source TEXT,
+                title TEXT,
+                description TEXT,
+                content TEXT,
+                category TEXT,
+                date TEXT,
+                extra TEXT,
+                first_seen REAL NOT NULL,
+                updated_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS articles_source_date ON articles (source, date);
+            CREATE INDEX IF NOT EXISTS articles_date ON articles (date);
+
+            CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(
+                title, description, content, content='articles', content_rowid='id'
+            );
+            CREATE TRIGGER IF NOT EXISTS articles_ai AFTER INSERT ON articles BEGIN
+                INSERT INTO articles_fts (rowid, title, description, content)
+                VALUES (new.id, new.title, new.description, new.content);
+            END;
+            CREATE TRIGGER IF NOT EXISTS articles_ad AFTER DELETE ON articles BEGIN
+                INSERT INTO articles_fts (articles_fts, rowid, title, description, content)
+                VALUES ('delete', old.id, old.title, old.description, old.content);
+            END;
+            CREATE TRIGGER IF NOT EXISTS articles_au AFTER UPDATE OF title, description, content ON articles
+            WHEN old.title IS NOT new.title OR old.description IS NOT new.description OR old.content IS NOT new.content
+            BEGIN
+                INSERT INTO articles_fts (articles_fts, rowid, title, description, content)
+                VALUES ('delete', old.id, old.title, old.description, old.content);
+                INSERT INTO articles_fts (rowid, title, description, content)
+                VALUES (new.id, new.title, new.description, new.content);
+            END;
+            """
+        )
+        self.db.commit()
+
+    def row(self, record, source=None):
+        record = {key: plain(value) for key, value in record.items()}
+        values = {"source": record.pop("source", None) or source}
+        for column, keys in FIELDS.items():
+            values[column] = next((record.pop(key) for key in keys if record.get(key) is not None), None)
+            for key in keys:
+                record.pop(key, None)
+        if not values["url"]:
+            return None
+        values["url"] = canonical_url(values["url"])
+        extra = {key: value for key, value in record.items() if value is not None}
+        values["extra"] = json.dumps(extra, default=str) if extra else None
+        return values
+
+    def upsert(self, records, source=None, batch_size=500):
+        """
+        Inserts or updates `records` (a DataFrame or an iterable of dicts such as format_src
+        output) in transactions of `batch_size` rows. Returns the number of rows written.
+        """
+        if hasattr(records, "to_dict"):
+            records = records.to_dict("records")
+        sql = f"""
+            INSERT INTO articles (url, {", ".join(COLUMNS)}, first_seen, updated_at)
+            VALUES (:url, {", ".join(":" + column for column in COLUMNS)}, :now, :now)
+            ON CONFLICT (url) DO UPDATE SET
+                {", ".join(f"{column} = COALESCE(excluded.{column}, {column})" for column in COLUMNS)},
+                updated_at = excluded.updated_at
+        """
+        now = time.time()
+        written = 0
+        batch = []
+        for record in records:
+            values = self.row(record, source)
+            if values is None:
+                continue
+            values["now"] = now
+            batch.append(values)
+            if len(batch) >= batch_size:
+                written += self.write_batch(sql, batch)
+                batch = []
+        if batch:
+            written += self.write_batch(sql, batch)
+        return written
+
+    def write_batch(self, sql, batch):
+        with self.db:
+            self.db.executemany(sql, batch)
+        return len(batch)
+
+    def get(self, url):
+        row = self.db.execute("SELECT * FROM articles WHERE url = ?", (canonical_url(url),)).fetchone()
+        return dict(row) if row else None
+
+    def search(self, query, source=None, since=None, until=None, limit=20):
+        """
+        Full-text search (FTS5 query syntax) over title, description and content, best
+        matches first. `since` / `until` bound the publication date (ISO strings or dates).
+        """
+        sql = """
+            SELECT a.url, a.source, a.title, a.description, a.category, a.date,
+                   snippet(articles_fts, -1, '[', ']', '...', 12) AS snippet,
+                   bm25(articles_fts) AS rank
+            FROM articles_fts JOIN articles AS a ON a.id = articles_fts.rowid
+            WHERE articles_fts MATCH ?
+        """
+        params = [query]
+        if source:
+            sql += " AND a.source = ?"
+            params.append(source)
+        if since is not None:
+            sql += " AND a.date >= ?"
+            params.append(plain(since) if not isinstance(since, str) else since)
+        if until is not None:
+            sql += " AND a.date < ?"
+            params.append(plain(until) if not isinstance(until, str) else until)
+        sql += " ORDER BY rank LIMIT ?"
+        params.append(limit)
+        return [dict(row) for row in self.db.execute(sql, params)]
+
+    def count(self, source=None):
+        if source:
+            return self.db.execute("SELECT COUNT(*) FROM articles WHERE source = ?", (source,)).fetchone()[0]
+        return self.db.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+
+    def close(self):
+        self.db.close()
@@ -1,69 +1,95 @@
-import asyncio
 import re
 from typing import Literal
 
-import pandas as pd
-from bs4 import BeautifulSoup
-
+from parse_pool import default_pool
+from parsers import make_tree
+from pipeline import stream_batches
+from records import ArticleRecord, collect, parse_date, records_frame
 from scraper import AsyncScraper, Scroller
-from scraper_utils import check_months, clean
+from scraper_utils import CardTracker, check_months, clean
+from state_store import default_store
+
+
+def parse_cards(content):
+    soup = make_tree(content)
+    articles = soup.find_all("div", {"class": "position-relative py-6 border-bottom border-dark"})
+    data = []
+    for i in articles:
+        title = clean(i.find("a"))
+        link = i.find("a").get("href")
+        date = clean(i.find("div", {"class": "row"}).find("div", {"class": "col-md-7"}).find_all("p", class_=None, recursive=False)[0])
+        desc = clean(i.find("p", {"class": "line-clamp-3"}))
+        category = clean(i.find("p", {"class": "kicker"}))
+
+        data.append(ArticleRecord(link=link, title=title, date=parse_date(date, "%b %d, %Y"), desc=desc, category=category))
+    return data
 
 
 class BakerTilly:
-    def __init__(self, headless=True):
+    def __init__(self, headless=True, scraper=None):
+        self.name = "baker_tilly"
         self.url = "https://www.bakertilly.com/insights"
-        self.scraper = AsyncScraper(headless=headless)
+        self.state = default_store
+        self.parse_pool = default_pool
+        self.scraper = scraper or AsyncScraper(headless=headless)
         self.scroller = Scroller()
-        self.posts = None
+        self.card_selector = "div.position-relative.py-6.border-bottom.border-dark"
 
-    async def show_more_posts(self, page, fetch):
+    async def show_more_posts(self, page, fetch, emit):
+        tracker = CardTracker(self.card_selector)
         while True:
             await page.wait_for_selector("div.container-fluid")
-            await page.wait_for_selector("div.position-relative.py-6.border-bottom.border-dark", timeout=5000)
-            content = await page.content()
-            self.posts = self.make_df(content)
+            await page.wait_for_selector(self.card_selector, timeout=5000)
+            batch = None
+            content = await tracker.new_cards(page)
+            if content:
+                batch = tracker.fresh(await self.parse(content))
+                await emit(batch)
 
             if fetch == "first":
                 break
             elif fetch == "all":
                 pass
+            elif fetch == "new":
+                if batch is not None and self.state.is_known(self.name, batch):
+                    break
             elif re.match(r"\b\d{1,2}m\b", fetch):
-                if check_months(self.posts, fetch):
+                if batch is not None and check_months(batch, fetch):
                     break
             else:
                 break
 
-            divs = await page.query_selector_all("div.position-relative.py-6.border-bottom.border-dark")
-            last_div = divs[-1]
-            await last_div.scroll_into_view_if_needed()
+            state = await self.scraper.waiter.snapshot(page, self.card_selector)
+            await page.locator(self.card_selector).last.scroll_into_view_if_needed()
+            if await self.scraper.waiter.wait(page, self.card_selector, state) == "timeout":
+                return
 
-            await asyncio.sleep(2)
-            await page.wait_for_timeout(2000)
+    async def parse(self, content):
+        return await self.parse_pool.run(parse_cards, content)
 
     def make_df(self, content):
-        soup = BeautifulSoup(content, "html.parser")
-        articles = soup.find_all("div", {"class": "position-relative py-6 border-bottom border-dark"})
-        data = []
-        for i in articles:
-            title = clean(i.find("a"))
-            link = i.find("a").get("href")
-            date = clean(i.find("div", {"class": "row"}).find("div", {"class": "col-md-7"}).find_all("p", class_=None, recursive=False)[0])
-            desc = clean(i.find("p", {"class": "line-clamp-3"}))
-            category = clean(i.find("p", {"class": "kicker"}))
+        return records_frame(parse_cards(content))
+
+    async def stream(self, fetch: Literal["first", "6m", "12m", "all", "new"] = "first"):
+        """Yields a list of ArticleRecords for each batch of cards as the listing is paged through."""
 
-            data.append({"link": link, "title": title, "date": date, "desc": desc, "category": category})
+        def crawl(emit):
+            return self.scraper.scrape(
+                self.url,
+                custom_function=self.show_more_posts,
+                block="listing",
+                fetch=fetch,
+                emit=emit,
+            )
 
-        df = pd.DataFrame(data)
-        df["date"] = pd.to_datetime(df["date"], format="%b %d, %Y")
-        return df
+        async with self.scraper:
+            async for batch in stream_batches(crawl):
+                yield batch
 
-    async def execute(self, fetch: Literal["first", "6m", "12m", "all"] = "first"):
+    async def execute(self, fetch: Literal["first", "6m", "12m", "all", "new"] = "first"):
         print(f"---{self.url}", end="---")
-        await self.scraper.scrape(
-            self.url,
-            custom_function=self.show_more_posts,
-            fetch=fetch,
-        )
-        self.posts.sort_values(by="date", ascending=False, inplace=True)
-        print(len(self.posts))
-        return self.posts
+        posts = await collect(self.stream(fetch))
+        posts = self.state.record(self.name, posts, fetch)
+        posts = posts.sort_values(by="date", ascending=False)
+        print(len(posts))
+        return posts
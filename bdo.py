@@ -1,37 +1,64 @@
-import asyncio
 import re
 from typing import Literal
 
-import pandas as pd
-from bs4 import BeautifulSoup
-
+from parse_pool import default_pool
+from parsers import make_tree
+from pipeline import stream_batches
+from records import ArticleRecord, collect, parse_date, records_frame
 from scraper import AsyncScraper
-from scraper_utils import check_months, clean
+from scraper_utils import CardTracker, check_months, clean
+from state_store import default_store
+
+
+def parse_cards(content):
+    soup = make_tree(content)
+    articles = soup.find_all("div", {"class": "InsightCardWrapperStyled-sc-1w8ojf6-0 gLShon insight-card-wrapper"})
+    data = []
+    for i in articles:
+        div = i.find("div", {"class": "animated-content hide"})
+        title = clean(div.find("h3"))
+        link = i.find("a").get("href")
+        date = clean(div.find("span", {"class": "publish-date"}))
+        desc = clean(div.find("p", {"class": "description"}))
+        category = clean(div.find("span", {"class": "tag"}))
+
+        data.append(ArticleRecord(link=link, title=title, date=parse_date(date, "%B %d, %Y"), desc=desc, category=category))
+    return data
 
 
 class BDO:
-    def __init__(self, headless=True):
+    def __init__(self, headless=True, scraper=None):
+        self.name = "bdo"
         self.urls = [
             "https://www.bdo.com/insights?insightType=article&insightService=assurance&",
             "https://www.bdo.com/insights?insightType=article&insightService=advisory_1&",
             "https://www.bdo.com/insights?insightType=article&insightService=digital&",
             "https://www.bdo.com/insights?insightType=article&insightService=tax_1&",
         ]
-        self.scraper = AsyncScraper(headless=headless)
-        self.posts = None
+        self.card_selector = "div.InsightCardWrapperStyled-sc-1w8ojf6-0.gLShon.insight-card-wrapper"
+        self.state = default_store
+        self.parse_pool = default_pool
+        self.scraper = scraper or AsyncScraper(headless=headless)
 
-    async def show_more_posts(self, page, fetch):
+    async def show_more_posts(self, page, fetch, emit):
+        tracker = CardTracker(self.card_selector)
         while True:
             await page.wait_for_selector("div.card-grid")
-            content = await page.content()
-            self.posts = self.make_df(content)
+            batch = None
+            content = await tracker.new_cards(page)
+            if content:
+                batch = tracker.fresh(await self.parse(content))
+                await emit(batch)
 
             if fetch == "first":
                 break
             elif fetch == "all":
                 pass
+            elif fetch == "new":
+                if batch is not None and self.state.is_known(self.name, batch):
+                    break
             elif re.match(r"\b\d{1,2}m\b", fetch):
-                if check_months(self.posts, fetch):
+                if batch is not None and check_months(batch, fetch):
                     break
             else:
                 break
@@ -40,43 +67,39 @@ class BDO:
 
             if not await page.is_visible(button_selector):
                 return
+            state = await self.scraper.waiter.snapshot(page, self.card_selector)
             await page.click(button_selector)
-            await page.wait_for_timeout(2000)
+            if await self.scraper.waiter.wait(page, self.card_selector, state) == "timeout":
+                return
 
-            await asyncio.sleep(2)
-            await page.wait_for_timeout(2000)
+    async def parse(self, content):
+        return await self.parse_pool.run(parse_cards, content)
 
     def make_df(self, content):
-        soup = BeautifulSoup(content, "html.parser")
-        articles = soup.find_all("div", {"class": "InsightCardWrapperStyled-sc-1w8ojf6-0 gLShon insight-card-wrapper"})
-        data = []
-        for i in articles:
-            div = i.find("div", {"class": "animated-content hide"})
-            title = clean(div.find("h3"))
-            link = i.find("a").get("href")
-            date = clean(div.find("span", {"class": "publish-date"}))
-            desc = clean(div.find("p", {"class": "description"}))
-            category = clean(div.find("span", {"class": "tag"}))
-
-            data.append({"link": link, "title": title, "date": date, "desc": desc, "category": category})
-
-        df = pd.DataFrame(data)
-        df["date"] = pd.to_datetime(df["date"], format="%B %d, %Y", errors="coerce")
-        return df
-
-    async def execute(self, url=None, fetch: Literal["first", "3m", "6m", "12m", "all"] = "first"):
+        return records_frame(parse_cards(content))
+
+    async def stream(self, url=None, fetch: Literal["first", "3m", "6m", "12m", "all", "new"] = "first"):
+        """Yields a list of ArticleRecords for each batch of cards as the listings are paged through."""
         urls = self.urls if not url else [url]
-        posts = []
-        for url in urls:
-            print(f"---{url}", end="---")
-            self.posts = None
-            await self.scraper.scrape(
+
+        def crawl(url):
+            return lambda emit: self.scraper.scrape(
                 url,
                 custom_function=self.show_more_posts,
+                block="listing",
                 fetch=fetch,
+                emit=emit,
             )
-            posts.append(self.posts.sort_values(by="date", ascending=False))
-        posts = pd.concat(posts)
+
+        async with self.scraper:
+            for url in urls:
+                print(f"---{url}", end="---")
+                async for batch in stream_batches(crawl(url)):
+                    yield batch
+
+    async def execute(self, url=None, fetch: Literal["first", "3m", "6m", "12m", "all", "new"] = "first"):
+        posts = await collect(self.stream(url, fetch))
+        posts = self.state.record(self.name, posts, fetch)
         posts = posts.sort_values(by="date", ascending=False)
-        print(len(self.posts))
+        print(len(posts))
         return posts
@@ -0,0 +1,342 @@
+import json
+import os
+import random
+from datetime import datetime, timedelta
+from html import escape
+
+# Recorded pages (committed, written by `benchmark.py record`) take precedence over the
+# synthetic ones, which are generated in memory on every run so they always match the generators.
+RECORDED = "fixtures"
+SEED = 7
+DEPTHS = (1, 3, 10)
+PAGE_SIZE = 12
+ARTICLE_PARAGRAPHS = (8, 40, 160)
+
+SOURCES = (
+    "baker_tilly",
+    "bdo",
+    "cbh",
+    "cla_connect",
+    "cohn_reznick",
+    "eisner_ramper",
+    "grant_thornton",
+    "marcum",
+    "plante_moran",
+    "prager_metis",
+    "pwc",
+    "rsm",
+    "withum",
+)
+JSON_SOURCES = {"cla_connect", "eisner_ramper", "pwc", "rsm", "withum"}
+# "Show more" listings keep every card loaded so far, so deeper pages are bigger; paged
+# listings and APIs return one page of items at any depth.
+SHOW_MORE = {"baker_tilly", "bdo", "grant_thornton", "plante_moran", "rsm"}
+
+WORDS = (
+    "tax audit revenue lease credit reporting guidance standard entity board committee capital "
+    "liability asset disclosure quarter fiscal federal state deduction provision regulator "
+    "investor market growth private equity transaction valuation payroll benefit compliance "
+    "digital cyber risk controls inventory supply chain nonprofit healthcare construction "
+    "manufacturing real estate technology insurance pension estate trust partnership update"
+).split()
+CATEGORIES = ("Tax", "Assurance", "Advisory", "Article", "Alert", "Webinar", "Insight")
+
+
+def load_fixtures(source):
+    """Returns (origin, {kind: [(name, content), ...]}) where kind is "listing", "table" or "article"."""
+    directory = os.path.join(RECORDED, source)
+    if os.path.isdir(directory) and os.listdir(directory):
+        origin, files = "recorded", {}
+        for name in os.listdir(directory):
+            with open(os.path.join(directory, name), encoding="utf-8") as file:
+                files[name] = file.read()
+    else:
+        origin, files = "synthetic", synthetic_fixtures(source)
+
+    fixtures = {}
+    for name in sorted(files, key=fixture_order):
+        fixtures.setdefault(name.split("-")[0], []).append((name, files[name]))
+    return origin, fixtures
+
+
+def fixture_order(name):
+    stem = os.path.splitext(name)[0]
+    kind, _, number = stem.partition("-")
+    return kind, int(number) if number.isdigit() else 0
+
+
+def synthetic_fixtures(source):
+    rng = random.Random(f"{SEED}-{source}")
+    files = {}
+    extension = "json" if source in JSON_SOURCES else "html"
+    for depth in DEPTHS:
+        first = 0 if source in SHOW_MORE else (depth - 1) * PAGE_SIZE
+        count = depth * PAGE_SIZE if source in SHOW_MORE else PAGE_SIZE
+        files[f"listing-{depth}.{extension}"] = LISTINGS[source](rng, range(first, first + count))
+    if source == "pwc":
+        files["table-1.html"] = pwc_table(rng, range(PAGE_SIZE))
+    for number, paragraphs in enumerate(ARTICLE_PARAGRAPHS, 1):
+        files[f"article-{number}.html"] = ARTICLES.get(source, article_page)(rng, source, paragraphs)
+    return files
+
+
+def text(rng, count):
+    return " ".join(rng.choice(WORDS) for _ in range(count))
+
+
+def title(rng):
+    return text(rng, rng.randint(4, 10)).capitalize()
+
+
+def paragraph(rng):
+    return ". ".join(text(rng, rng.randint(8, 20)).capitalize() for _ in range(rng.randint(2, 6))) + "."
+
+
+def published(index):
+    # Newest first, a few days apart, as the listings are sorted
+    return datetime(2025, 6, 30) - timedelta(days=index * 3)
+
+
+def slug(index):
+    return f"insight-{index:05d}"
+
+
+def page(body, heading="Insights"):
+    # A page shell with the head, navigation and footer weight real sites carry around the cards
+    links = "".join(f'<li class="menu-item"><a href="/{word}">{word.title()}</a></li>' for word in WORDS[:24])
+    return f"""<!DOCTYPE html>
+<html lang="en"><head><meta charset="utf-8"><title>{escape(heading)}</title>
+<meta name="description" content="{escape(heading)} and thought leadership">
+<link rel="stylesheet" href="/assets/site.css"><style>{".card{margin:0 auto;padding:1rem}" * 40}</style>
+<script>window.dataLayer = window.dataLayer || []; {"dataLayer.push({event: 'view'});" * 30}</script>
+</head><body>
+<header class="site-header"><nav class="main-nav"><ul class="menu">{links}</ul></nav>
+<a class="logo" href="/"><img src="/assets/logo.svg" alt="Firm logo"></a></header>
+<main>{body}</main>
+<aside class="sidebar"><div class="related-posts"><ul>{links}</ul></div></aside>
+<footer class="site-footer"><ul class="footer-menu">{links}</ul><p>Privacy Policy</p><p>All rights reserved</p></footer>
+<script src="/assets/app.js"></script></body></html>"""
+
+
+def baker_tilly_listing(rng, items):
+    cards = "".join(
+        f"""<div class="position-relative py-6 border-bottom border-dark"><div class="row">
+<div class="col-md-5"><img src="/images/{slug(i)}.jpg" alt=""></div><div class="col-md-7">
+<p class="kicker">{rng.choice(CATEGORIES)}</p><p>{published(i):%b %d, %Y}</p>
+<a class="stretched-link" href="https://www.bakertilly.com/insights/{slug(i)}">{escape(title(rng))}</a>
+<p class="line-clamp-3">{text(rng, 30)}</p></div></div></div>"""
+        for i in items
+    )
+    return page(f'<div class="container">{cards}<button class="btn">Load more</button></div>')
+
+
+def bdo_listing(rng, items):
+    cards = "".join(
+        f"""<div class="InsightCardWrapperStyled-sc-1w8ojf6-0 gLShon insight-card-wrapper">
+<a href="https://www.bdo.com/insights/{slug(i)}"><div class="animated-content hide">
+<span class="tag">{rng.choice(CATEGORIES)}</span><h3>{escape(title(rng))}</h3>
+<span class="publish-date">{published(i):%B %d, %Y}</span><p class="description">{text(rng, 30)}</p>
+</div></a></div>"""
+        for i in items
+    )
+    return page(f'<div class="insights-grid">{cards}</div>')
+
+
+def cbh_listing(rng, items):
+    cards = "".join(
+        f"""<div class="insights-listing-block__card">
+<div class="insights-listing-block__category">{rng.choice(CATEGORIES)}</div>
+<div class="insights-listing-block__title"><a href="https://www.cbh.com/insights/{slug(i)}/">{escape(title(rng))}</a></div>
+<div class="insights-listing-block__date">{published(i):%B %d, %Y}</div>
+<div class="insights-listing-block__description">{text(rng, 30)}</div>
+<div class="insights-listing-block__badges">{"".join(f'<a href="/tag/{word}/">{word}</a>' for word in rng.sample(WORDS, 3))}</div>
+</div>"""
+        for i in items
+    )
+    return page(f'<div id="SearchResults" class="insights-listing-block">{cards}</div>')
+
+
+def cohn_reznick_listing(rng, items):
+    cards = "".join(
+        f"""<div class="sc-article"><a href="https://www.cohnreznick.com/insights/{slug(i)}">
+<div class="Type"><span>{rng.choice(CATEGORIES)}</span><span>{rng.choice(CATEGORIES)}</span></div>
+<div class="Title">{escape(title(rng))}</div>
+<div class="publishDate">PublishedDate : {published(i):%A, %B %d, %Y} at 10:00 AM</div>
+<div class="sc-blHHSb lhZsno">{text(rng, 30)}</div></a></div>"""
+        for i in items
+    )
+    return page(f'<div class="searchArticlesListView">{cards}</div>')
+
+
+def marcum_listing(rng, items):
+    cards = "".join(
+        f"""<article class="card"><a href="https://www.marcumllp.com/insights/{slug(i)}">
+<h2 class="card__title">{escape(title(rng))}</h2><div class="card__meta">{published(i):%B %d, %Y}</div></a></article>"""
+        for i in items
+    )
+    return page(f'<div class="page-body__right page-body__right--wide">{cards}</div>')
+
+
+def plante_moran_listing(rng, items):
+    cards = "".join(
+        f"""<li class="thought-item ng-scope"><div class="thought-item-details">
+<a href="https://www.plantemoran.com/explore-our-thinking/insight/{slug(i)}">{escape(title(rng))}</a>
+<span class="item type ng-binding ng-scope">{rng.choice(CATEGORIES)}</span>
+<span class="item date ng-binding">{published(i):%B %d, %Y}</span>
+<div class="brief ng-binding ng-scope">{text(rng, 30)}</div></div></li>"""
+        for i in items
+    )
+    return page(f'<ul class="thought-items">{cards}</ul>')
+
+
+def prager_metis_listing(rng, items):
+    cards = "".join(
+        f"""<article class="fusion-post-grid post"><h2 class="entry-title fusion-post-title">
+<a href="https://pragermetis.com/{slug(i)}/">{escape(title(rng))}</a></h2>
+<div class="author-block">{published(i):%b %d, %Y}<span class="author">Prager Metis</span></div>
+<div class="fusion-post-content-container"><p>{text(rng, 30)}</p></div></article>"""
+        for i in items
+    )
+    return page(f'<div id="posts-container" class="fusion-posts-container">{cards}</div>')
+
+
+def grant_thornton_listing(rng, items):
+    cards = "".join(
+        f"""<div class="coveo-card-layout CoveoResult"><a href="https://www.grantthornton.com/insights/articles/{slug(i)}">
+<p class="cmp-search__result-category">{rng.choice(("ARTICLE", "ARTICLE", "ALERT", "SURVEY REPORT"))}</p>
+<h5 class="cmp-search__result-title">{escape(title(rng))}</h5></a></div>"""
+        for i in items
+    )
+    return page(f'<div class="CoveoResultList">{cards}</div>')
+
+
+def pwc_table(rng, items):
+    rows = "".join(
+        f"""<div class="columns"><a href="https://viewpoint.pwc.com/dt/us/en/{slug(i)}.html">
+<div class="module-heading">{escape(title(rng))}</div></a><div class="date">{published(i):%d %b %Y}</div>
+<div class="pwc-col">{rng.choice(CATEGORIES)} {i}</div></div>"""
+        for i in items
+    )
+    return page(f'<div class="condensed-cards">{rows}</div>')
+
+
+def pwc_listing(rng, items):
+    docs = [
+        {
+            "url": f"https://viewpoint.pwc.com/dt/us/en/{slug(i)}.html",
+            "title": title(rng),
+            "pwcReleaseDate": f"{published(i):%d %b %Y}",
+            "pwcContentId": f"pwc-{i}",
+            "pwcContentType": rng.choice(CATEGORIES),
+            "description": text(rng, 30),
+        }
+        for i in items
+    ]
+    return json.dumps({"response": {"numFound": PAGE_SIZE * DEPTHS[-1], "start": items.start, "docs": docs}})
+
+
+def withum_listing(rng, items):
+    posts = [
+        {
+            "id": i,
+            "link": f"https://www.withum.com/resources/{slug(i)}/",
+            "title": {"rendered": title(rng)},
+            "excerpt": {"rendered": f"<p>{text(rng, 30)}</p>"},
+            "_embedded": {"wp:featuredmedia": [{"id": i, "date": f"{published(i):%Y-%m-%dT%H:%M:%S}", "source_url": f"https://www.withum.com/wp-content/{slug(i)}.jpg"}]},
+        }
+        for i in items
+    ]
+    return json.dumps(posts)
+
+
+def cla_connect_listing(rng, items):
+    resources = [
+        {
+            "url": f"/en/resources/{slug(i)}",
+            "title": title(rng),
+            "date": f"{published(i):%m/%d/%Y}",
+            "abstractText": text(rng, 30),
+            "type": rng.choice(CATEGORIES),
+            "target": "_self",
+            "image": {"src": f"/images/{slug(i)}.jpg", "alt": ""},
+            "industries": rng.sample(WORDS, 2),
+        }
+        for i in items
+    ]
+    return json.dumps({"data": {"resources": resources, "hasMoreResources": True}})
+
+
+def eisner_ramper_listing(rng, items):
+    posts = [{"title": title(rng), "link": f"/insights/{slug(i)}", "displayDate": f"{published(i):%B %d, %Y}", "summary": text(rng, 30)} for i in items]
+    return json.dumps({"paging": {"recordsPerPage": PAGE_SIZE, "page": items.start // PAGE_SIZE + 1}, "items": posts})
+
+
+def rsm_listing(rng, items):
+    results = [
+        {
+            "title": title(rng),
+            "formattedDate": f"{published(i):%B %d, %Y}",
+            "description": text(rng, 30),
+            "callToActionLink": {"url": f"/insights/{slug(i)}.html"},
+            "displayableTags": [{"title": word} for word in rng.sample(WORDS, 3)],
+        }
+        for i in items
+    ]
+    return json.dumps({"originalResultsList": results})
+
+
+def article_body(rng, paragraphs):
+    parts = []
+    for i in range(paragraphs):
+        if i % 6 == 0:
+            parts.append(f"<h2>{escape(title(rng))}</h2>")
+        if i % 9 == 4:
+            alt = rng.choice(("Chart of quarterly results", "Team reviewing a report", "share on linkedin", "icon", ""))
+            parts.append(f'<figure><img src="/images/figure-{i}.{rng.choice(("jpg", "png", "svg"))}" alt="{alt}"></figure>')
+        if i % 11 == 7:
+            parts.append(f'<div class="share-buttons"><a href="#">Share on LinkedIn</a><img src="/icons/twitter.svg" alt="twitter"></div>')
+        parts.append(f"<p>{paragraph(rng)}</p>")
+    # Syndicated pages repeat sentences, which deduplicate_text drops
+    parts.append(f"<p>{paragraph(rng)} {paragraph(rng)}</p>" * 2)
+    return "\n".join(parts)
+
+
+def article_page(rng, source, paragraphs):
+    heading = title(rng)
+    body = article_body(rng, paragraphs)
+    return page(f'<article class="post"><h1>{escape(heading)}</h1><div class="entry-content">{body}</div></article>', heading)
+
+
+def grant_thornton_article(rng, source, paragraphs):
+    heading = title(rng)
+    sections = "".join(
+        f'<div class="section aem-GridColumn aem-GridColumn--default--12"><div class="text">{article_body(rng, 8)}</div></div>'
+        for _ in range(max(1, paragraphs // 8))
+    )
+    hero = f'<div class="cmp-hero-banner"><h1>{escape(heading)}</h1><time class="cmp-hero-banner__article-date">{published(rng.randint(0, 90)):%B %d, %Y}</time></div>'
+    return page(f'<article>{hero}<div class="aem-Grid">{sections}</div></article>', heading)
+
+
+def pwc_article(rng, source, paragraphs):
+    heading = title(rng)
+    blocks = "".join(f"<div><p>{paragraph(rng)}</p></div>" for _ in range(paragraphs))
+    pdf = '<div><p>A PDF version of the full publication is attached here: <a href="/doc.pdf">download</a></p></div>'
+    return page(f'<article><h1>{escape(heading)}</h1><div class="topic doc-body-content">{blocks}{pdf}</div></article>', heading)
+
+
+LISTINGS = {
+    "baker_tilly": baker_tilly_listing,
+    "bdo": bdo_listing,
+    "cbh": cbh_listing,
+    "cla_connect": cla_connect_listing,
+    "cohn_reznick": cohn_reznick_listing,
+    "eisner_ramper": eisner_ramper_listing,
+    "grant_thornton": grant_thornton_listing,
+    "marcum": marcum_listing,
+    "plante_moran": plante_moran_listing,
+    "prager_metis": prager_metis_listing,
+    "pwc": pwc_listing,
+    "rsm": rsm_listing,
+    "withum": withum_listing,
+}
+ARTICLES = {"grant_thornton": grant_thornton_article, "pwc": pwc_article}
@@ -0,0 +1,523 @@
+import argparse
+import asyncio
+import gc
+import hashlib
+import json
+import os
+import platform
+import re
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+import pandas as pd
+from bs4 import Comment, Declaration, NavigableString
+
+import parsers as backends
+from baker_tilly import BakerTilly
+from baker_tilly import parse_cards as baker_tilly_cards
+from bdo import BDO
+from bdo import parse_cards as bdo_cards
+from bench_fixtures import DEPTHS, JSON_SOURCES, RECORDED, load_fixtures
+from cbh import CBH
+from cbh import parse_cards as cbh_cards
+from cohn_reznick import CohnReznick
+from cohn_reznick import parse_cards as cohn_reznick_cards
+from grant_thornton import parse_article as grant_thornton_article
+from grant_thornton import parse_cards as grant_thornton_cards
+from http_client import AsyncHTTPClient, HTTPResponse
+from marcum import Marcum
+from marcum import parse_cards as marcum_cards
+from orchestrator import SOURCES, build_source
+from parsers import available_parsers, make_soup, use_parser
+from plante_moran import PlanteMoran
+from plante_moran import parse_cards as plante_moran_cards
+from prager_metis import PragerMetis
+from prager_metis import parse_cards as prager_metis_cards
+from pwc import parse_article as pwc_article
+from pwc import parse_table as pwc_table
+from records import ArticleRecord, RecordBuffer, parse_date
+from scraper import AsyncScraper, extract_image_data, filter_image_urls, parse_src
+from scraper_utils import check_months, extract_article_text
+
+# Regression thresholds for `suite --baseline`: the fraction of throughput an extractor may
+# lose, and of peak memory it may gain (ignored below MEMORY_FLOOR_KB of growth, where
+# allocator noise dominates).
+MAX_SLOWDOWN = 0.15
+MAX_MEMORY_GROWTH = 0.25
+MEMORY_FLOOR_KB = 64
+# Each timed sample runs a fixture enough times to take at least this long
+MIN_SAMPLE_S = 0.05
+ARTICLE_URL = "https://example.com/insights/article"
+
+
+def listing_extractors():
+    return {
+        "baker_tilly": BakerTilly().make_df,
+        "bdo": BDO().make_df,
+        "cbh": CBH().make_df,
+        "cohn_reznick": CohnReznick().make_df,
+        "grant_thornton": grant_thornton_cards,
+        "marcum": Marcum().make_df,
+        "plante_moran": PlanteMoran().make_df,
+        "prager_metis": PragerMetis().make_df,
+        "pwc": pwc_table,
+    }
+
+
+def normalize(result):
+    if isinstance(result, list):
+        result = [item.as_dict() if isinstance(item, ArticleRecord) else item for item in result]
+    if isinstance(result, pd.DataFrame):
+        result = result.astype(object).where(result.notna(), None).to_dict("records")
+    return json.loads(json.dumps(result, default=str))
+
+
+def check_parity(extract, contents, parsers):
+    """Runs `extract` on every page under each listing parser and reports the parsers whose output differs from html.parser."""
+    mismatches = {}
+    for content in contents:
+        with use_parser(listing="html.parser"):
+            expected = normalize(extract(content))
+        for parser in parsers:
+            with use_parser(listing=parser):
+                if normalize(extract(content)) != expected:
+                    mismatches[parser] = mismatches.get(parser, 0) + 1
+    return mismatches
+
+
+def measure(extract, contents, repeat=3):
+    size = sum(len(content) for content in contents)
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for content in contents:
+            extract(content)
+        best = min(best, time.perf_counter() - start)
+    return {"seconds": best, "pages_per_s": len(contents) / best, "mb_per_s": size / best / 1e6}
+
+
+def bench_parsers(source, paths, repeat=3):
+    extract = listing_extractors()[source]
+    contents = []
+    for path in paths:
+        with open(path, encoding="utf-8") as file:
+            contents.append(file.read())
+
+    parsers = available_parsers()
+    results = {"source": source, "pages": len(contents), "parity": check_parity(extract, contents, parsers), "throughput": {}}
+    for parser in parsers:
+        with use_parser(listing=parser):
+            results["throughput"][parser] = measure(extract, contents, repeat)
+    return results
+
+
+def legacy_is_relevant_text(element):
+    # The per-string filter extract_article_text used before the single-pass walk, kept as the
+    # reference for the parity check: it re-walks every ancestor of every string.
+    if element.parent.name in {"style", "script", "head", "title", "meta", "[document]", "header", "footer", "nav", "sidebar", "aside"}:
+        return False
+    if isinstance(element, (Comment, Declaration)):
+        return False
+
+    parent_classes, parent_ids = [], []
+    parent = element.parent
+    while parent and parent.name != "[document]":
+        if parent.get("class"):
+            parent_classes.extend(parent["class"])
+        if parent.get("id"):
+            parent_ids.append(parent["id"])
+        parent = parent.parent
+
+    skip_patterns = ["nav", "menu", "header", "footer", "sidebar", "comment", "widget", "banner", "ad-", "-ad", "social", "share", "related", "recommended", "popular", "trending"]
+    for pattern in skip_patterns:
+        if any(pattern in str(class_).lower() for class_ in parent_classes):
+            return False
+        if any(pattern in str(id_).lower() for id_ in parent_ids):
+            return False
+
+    if isinstance(element, NavigableString):
+        text = str(element).strip()
+        if not text or len(text) < 50:
+            return False
+        if re.match(r"^\s*$", text):
+            return False
+        menu_patterns = [r"^about\s+us$", r"^contact(\s+us)?$", r"^privacy\s+policy$", r"^terms(\s+of\s+service)?$", r"^copyright\s+\d{4}$", r"^all\s+rights\s+reserved$"]
+        if any(re.match(pattern, text.lower()) for pattern in menu_patterns):
+            return False
+    return True
+
+
+def legacy_extract_article_text(soup):
+    main_content = None
+    for tag in ["article", "main", '[role="main"]']:
+        main_content = soup.find(tag)
+        if main_content:
+            break
+    if not main_content:
+        main_content = soup
+    return " ".join(text.strip() for text in filter(legacy_is_relevant_text, main_content.find_all(string=True)))
+
+
+def bench_articles(paths, repeat=3):
+    """Compares extract_article_text with the legacy per-string filter on saved article pages. Parsing is excluded from the timings."""
+    soups = []
+    for path in paths:
+        with open(path, encoding="utf-8") as file:
+            soups.append(make_soup(file.read()))
+
+    mismatches = [path for path, soup in zip(paths, soups) if extract_article_text(soup) != legacy_extract_article_text(soup)]
+    results = {"pages": len(soups), "mismatches": mismatches, "throughput": {}}
+    for name, extract in [("legacy", legacy_extract_article_text), ("single_pass", extract_article_text)]:
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for soup in soups:
+                extract(soup)
+            best = min(best, time.perf_counter() - start)
+        results["throughput"][name] = {"seconds": best, "pages_per_s": len(soups) / best}
+    results["speedup"] = results["throughput"]["legacy"]["seconds"] / results["throughput"]["single_pass"]["seconds"]
+    return results
+
+
+def synthetic_listing(pages, per_page):
+    start = datetime(2015, 1, 1)
+    return [
+        [
+            {
+                "link": f"https://example.com/insights/{page}/{i}",
+                "title": f"Article {page}-{i}",
+                "date": (start + timedelta(days=page * per_page + i)).strftime("%B %d, %Y"),
+                "desc": "Summary of the article " * 8,
+                "category": "Tax",
+            }
+            for i in range(per_page)
+        ]
+        for page in range(pages)
+    ]
+
+
+def dataframe_listing(pages):
+    # The per-page path the sources used before ArticleRecord: a DataFrame and a
+    # pd.to_datetime call for every page, concatenated at the end.
+    frames = []
+    for page in pages:
+        df = pd.DataFrame(page)
+        df["date"] = pd.to_datetime(df["date"], format="%B %d, %Y")
+        check_months(df, "240m")
+        frames.append(df)
+    return pd.concat(frames, ignore_index=True)
+
+
+def record_listing(pages):
+    buffer = RecordBuffer()
+    for page in pages:
+        batch = [ArticleRecord(link=item["link"], title=item["title"], date=parse_date(item["date"], "%B %d, %Y"), desc=item["desc"], category=item["category"]) for item in page]
+        check_months(batch, "240m")
+        buffer.extend(batch)
+    return buffer.to_df()
+
+
+def bench_records(pages=500, per_page=20, repeat=3):
+    """Compares per-page DataFrames with ArticleRecords plus one RecordBuffer build on a synthetic crawl."""
+    listing = synthetic_listing(pages, per_page)
+    columns = ["link", "title", "date", "desc", "category"]
+    expected = dataframe_listing(listing)[columns]
+    parse_date.cache_clear()
+    parity = record_listing(listing)[columns].equals(expected)
+
+    results = {"pages": pages, "per_page": per_page, "parity": parity, "paths": {}}
+    for name, build in [("dataframe", dataframe_listing), ("records", record_listing)]:
+        best = float("inf")
+        for _ in range(repeat):
+            parse_date.cache_clear()
+            start = time.perf_counter()
+            build(listing)
+            best = min(best, time.perf_counter() - start)
+
+        parse_date.cache_clear()
+        tracemalloc.start()
+        build(listing)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        results["paths"][name] = {"seconds": best, "pages_per_s": pages / best, "peak_mb": peak / 1e6}
+    return results
+
+
+def as_response(content):
+    return HTTPResponse(ARTICLE_URL, 200, {}, content.encode())
+
+
+def parse_images(content):
+    return extract_image_data(make_soup(content), ARTICLE_URL)
+
+
+def suite_extractors():
+    """
+    What `suite` times for each source, as (name, fixture kind, function, prepare) tuples.
+    `prepare` turns a fixture into the function's input outside the timings (None passes the
+    raw page). The first listing extractor returns records, which `record` reads links from.
+    """
+    sources = {name: build_source(name, None, None) for name in SOURCES}
+    cbh, cohn_reznick, marcum, prager_metis = (sources[name] for name in ("cbh", "cohn_reznick", "marcum", "prager_metis"))
+    cla_connect, eisner_ramper, pwc, rsm, withum = (sources[name] for name in ("cla_connect", "eisner_ramper", "pwc", "rsm", "withum"))
+    extractors = {
+        "baker_tilly": [("parse_cards", "listing", baker_tilly_cards, None), ("make_df", "listing", sources["baker_tilly"].make_df, None)],
+        "bdo": [("parse_cards", "listing", bdo_cards, None), ("make_df", "listing", sources["bdo"].make_df, None)],
+        "cbh": [("parse_cards", "listing", lambda content: cbh_cards(content, cbh.scope), None), ("make_df", "listing", cbh.make_df, None)],
+        "cla_connect": [("make_records", "listing", lambda content: cla_connect.make_records(json.loads(content)["data"]), None)],
+        "cohn_reznick": [
+            ("parse_cards", "listing", lambda content: cohn_reznick_cards(content, cohn_reznick.scope), None),
+            ("make_df", "listing", cohn_reznick.make_df, None),
+        ],
+        "eisner_ramper": [("make_records", "listing", lambda content: eisner_ramper.make_records(json.loads(content)["items"]), None)],
+        "grant_thornton": [("parse_cards", "listing", grant_thornton_cards, None), ("parse_article", "article", grant_thornton_article, None)],
+        "marcum": [("parse_cards", "listing", lambda content: marcum_cards(content, marcum.scope), None), ("make_df", "listing", marcum.make_df, None)],
+        "plante_moran": [("parse_cards", "listing", plante_moran_cards, None), ("make_df", "listing", sources["plante_moran"].make_df, None)],
+        "prager_metis": [
+            ("parse_cards", "listing", lambda content: prager_metis_cards(content, prager_metis.scope), None),
+            ("make_df", "listing", prager_metis.make_df, None),
+        ],
+        "pwc": [
+            ("make_records", "listing", lambda content: pwc.make_records(json.loads(content)["response"]), None),
+            ("parse_table", "table", pwc_table, None),
+            ("parse_article", "article", pwc_article, None),
+        ],
+        "rsm": [("make_records", "listing", lambda content: rsm.make_records(json.loads(content)), None)],
+        "withum": [("make_records", "listing", withum.make_records, as_response)],
+    }
+    # The article extractors every source's pages go through. format_src hands the page to
+    # parse_src in the parse pool, so parse_src is what is timed for it.
+    shared = [
+        ("extract_article_text", "article", extract_article_text, make_soup),
+        ("format_src", "article", lambda content: parse_src(content, ARTICLE_URL), None),
+        ("filter_image_urls", "article", filter_image_urls, parse_images),
+    ]
+    return {name: entries + shared for name, entries in extractors.items()}
+
+
+def profile(extract, content, prepare=None, repeat=5):
+    """Best-of-`repeat` throughput of `extract` on one fixture, then its peak and retained memory on a single traced run."""
+    data = prepare(content) if prepare else content
+    start = time.perf_counter()
+    extract(data)
+    number = max(1, int(MIN_SAMPLE_S / max(time.perf_counter() - start, 1e-9)))
+
+    best = float("inf")
+    for _ in range(repeat):
+        # A warm date cache would hide the parsing cost after the first sample
+        parse_date.cache_clear()
+        start = time.perf_counter()
+        for _ in range(number):
+            extract(data)
+        best = min(best, (time.perf_counter() - start) / number)
+
+    parse_date.cache_clear()
+    gc.collect()
+    tracemalloc.start()
+    result = extract(data)
+    current, peak = tracemalloc.get_traced_memory()
+    snapshot = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    del result
+
+    size = len(content.encode())
+    return {
+        "bytes": size,
+        "seconds": best,
+        "pages_per_s": 1 / best,
+        "mb_per_s": size / best / 1e6,
+        "peak_kb": peak / 1024,
+        "retained_kb": current / 1024,
+        "retained_blocks": sum(stat.count for stat in snapshot.statistics("filename")),
+    }
+
+
+def run_suite(sources=None, repeat=5):
+    """Times every extractor on its source's fixtures. Totals are per extractor, with the per-fixture numbers under "fixtures"."""
+    origins, results = {}, []
+    digest = hashlib.sha256()
+    for source, extractors in suite_extractors().items():
+        if sources and source not in sources:
+            continue
+        origins[source], fixtures = load_fixtures(source)
+        for kind in sorted(fixtures):
+            for fixture, content in fixtures[kind]:
+                digest.update(f"{source}/{fixture}\0{content}\0".encode())
+        for name, kind, extract, prepare in extractors:
+            pages = fixtures.get(kind)
+            if not pages:
+                continue
+            per_fixture = {fixture: profile(extract, content, prepare, repeat) for fixture, content in pages}
+            seconds = sum(entry["seconds"] for entry in per_fixture.values())
+            size = sum(entry["bytes"] for entry in per_fixture.values())
+            results.append(
+                {
+                    "source": source,
+                    "extractor": name,
+                    "kind": kind,
+                    "pages": len(per_fixture),
+                    "bytes": size,
+                    "seconds": seconds,
+                    "pages_per_s": len(per_fixture) / seconds,
+                    "mb_per_s": size / seconds / 1e6,
+                    "peak_kb": max(entry["peak_kb"] for entry in per_fixture.values()),
+                    "retained_kb": sum(entry["retained_kb"] for entry in per_fixture.values()),
+                    "retained_blocks": sum(entry["retained_blocks"] for entry in per_fixture.values()),
+                    "fixtures": per_fixture,
+                }
+            )
+    meta = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "parser": backends.PARSER,
+        "listing_parser": backends.LISTING_PARSER,
+        "repeat": repeat,
+        "fixtures": origins,
+        "fixture_digest": digest.hexdigest(),
+    }
+    return {"meta": meta, "results": results}
+
+
+def compare(report, baseline, max_slowdown=MAX_SLOWDOWN, max_memory_growth=MAX_MEMORY_GROWTH):
+    """
+    Extractors slower or hungrier than in `baseline` (a previous suite report) by more than the
+    thresholds. Reports made with another Python, other parser backends or other fixtures are
+    not compared at all: their differences are not regressions.
+    """
+    keys = ("python", "parser", "listing_parser", "fixtures", "fixture_digest")
+    mismatched = [key for key in keys if baseline.get("meta", {}).get(key) != report["meta"][key]]
+    if mismatched:
+        return {"regressions": [], "comparable": False, "mismatched_meta": mismatched}
+
+    previous = {(entry["source"], entry["extractor"]): entry for entry in baseline["results"]}
+    regressions = []
+    for entry in report["results"]:
+        old = previous.get((entry["source"], entry["extractor"]))
+        if old is None:
+            continue
+        checks = [
+            ("pages_per_s", entry["pages_per_s"] < old["pages_per_s"] * (1 - max_slowdown)),
+            ("peak_kb", entry["peak_kb"] > old["peak_kb"] * (1 + max_memory_growth) and entry["peak_kb"] - old["peak_kb"] > MEMORY_FLOOR_KB),
+        ]
+        for metric, regressed in checks:
+            if regressed:
+                regressions.append(
+                    {
+                        "source": entry["source"],
+                        "extractor": entry["extractor"],
+                        "metric": metric,
+                        "baseline": old[metric],
+                        "current": entry[metric],
+                        "change": entry[metric] / old[metric] - 1,
+                    }
+                )
+    return {"regressions": regressions, "comparable": True, "mismatched_meta": []}
+
+
+def recording_urls(name, source):
+    """{depth: url} of the listing pages `record` can load directly. "Show more" listings need the page driven, so only their first page is recorded."""
+    if name == "pwc":
+        return {depth: source.urls[0].format((depth - 1) * source.rows, source.rows) for depth in DEPTHS}
+    if name in ("cla_connect", "withum"):
+        return {depth: source.api_url.format(depth) for depth in DEPTHS}
+    if name in ("cbh", "eisner_ramper"):
+        return {depth: source.url.format(depth) for depth in DEPTHS}
+    return {1: getattr(source, "urls", [getattr(source, "url", None)])[0]}
+
+
+async def record(names, articles=3):
+    """Saves live listing and article pages under fixtures/<source>/. The only command that goes online."""
+    extractors = suite_extractors()
+    scraper, client = AsyncScraper(), AsyncHTTPClient()
+    saved = {}
+    async with scraper, client:
+        for name in names:
+            source = build_source(name, scraper, client)
+            directory = os.path.join(RECORDED, name)
+            os.makedirs(directory, exist_ok=True)
+            extension = "json" if name in JSON_SOURCES else "html"
+            parse = next(extract for _, kind, extract, _ in extractors[name] if kind == "listing")
+            links = []
+            for depth, url in recording_urls(name, source).items():
+                if name in JSON_SOURCES:
+                    response = await client.get(url)
+                    if response.status != 200:
+                        continue
+                    content = response.text()
+                    records = parse(as_response(content) if name == "withum" else content)
+                else:
+                    content = await scraper.scrape(url, scope=getattr(source, "scope", None))
+                    records = parse(content)
+                with open(os.path.join(directory, f"listing-{depth}.{extension}"), "w", encoding="utf-8") as file:
+                    file.write(content)
+                links.extend(item.get("link") for item in records)
+
+            for number, link in enumerate([link for link in links if link][:articles], 1):
+                content = await scraper.scrape(link)
+                with open(os.path.join(directory, f"article-{number}.html"), "w", encoding="utf-8") as file:
+                    file.write(content)
+            saved[name] = sorted(os.listdir(directory))
+    return saved
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmarks for the parsers and extractors.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    parsers = commands.add_parser("parsers", help="compare listing parser backends on saved pages")
+    parsers.add_argument("source", choices=sorted(listing_extractors()))
+    parsers.add_argument("paths", nargs="+")
+    parsers.add_argument("--repeat", type=int, default=3)
+
+    articles = commands.add_parser("articles", help="compare article text extraction with the legacy filter on saved pages")
+    articles.add_argument("paths", nargs="+")
+    articles.add_argument("--repeat", type=int, default=3)
+
+    records = commands.add_parser("records", help="compare per-page DataFrames with ArticleRecord batches on a synthetic crawl")
+    records.add_argument("--pages", type=int, default=500)
+    records.add_argument("--per-page", type=int, default=20)
+    records.add_argument("--repeat", type=int, default=3)
+
+    suite = commands.add_parser("suite", help="time every parser and extractor on the per-source fixtures, offline")
+    suite.add_argument("--sources", nargs="*", choices=sorted(SOURCES))
+    suite.add_argument("--repeat", type=int, default=5)
+    suite.add_argument("--parser", choices=sorted(backends.BS4_PARSERS))
+    suite.add_argument("--listing-parser", choices=available_parsers())
+    suite.add_argument("--output", help="also write the report to this file, e.g. to use as a baseline")
+    suite.add_argument("--baseline", help="a previous report; exits with status 1 on a regression")
+    suite.add_argument("--max-slowdown", type=float, default=MAX_SLOWDOWN)
+    suite.add_argument("--max-memory-growth", type=float, default=MAX_MEMORY_GROWTH)
+
+    recorder = commands.add_parser("record", help=f"save live pages as fixtures under {RECORDED}/ (needs network access)")
+    recorder.add_argument("--sources", nargs="*", choices=sorted(SOURCES))
+    recorder.add_argument("--articles", type=int, default=3)
+
+    args = parser.parse_args()
+    if args.command == "parsers":
+        results = bench_parsers(args.source, args.paths, args.repeat)
+    elif args.command == "articles":
+        results = bench_articles(args.paths, args.repeat)
+    elif args.command == "records":
+        results = bench_records(args.pages, args.per_page, args.repeat)
+    elif args.command == "record":
+        results = asyncio.run(record(args.sources or list(SOURCES), args.articles))
+    elif args.command == "suite":
+        with use_parser(args.parser, args.listing_parser):
+            results = run_suite(args.sources, args.repeat)
+        if args.baseline:
+            with open(args.baseline, encoding="utf-8") as file:
+                results.update(compare(results, json.load(file), args.max_slowdown, args.max_memory_growth))
+            if not results["comparable"]:
+                print(f"warning: not compared with {args.baseline}, it differs in {', '.join(results['mismatched_meta'])}", file=sys.stderr)
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as file:
+                json.dump(results, file, indent=2)
+    print(json.dumps(results, indent=2))
+    if results.get("regressions"):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
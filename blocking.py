@@ -0,0 +1,142 @@
+from urllib.parse import urlparse
+
+TRACKER_DOMAINS = {
+    "google-analytics.com",
+    "googletagmanager.com",
+    "googleadservices.com",
+    "googlesyndication.com",
+    "doubleclick.net",
+    "facebook.net",
+    "facebook.com",
+    "linkedin.com",
+    "licdn.com",
+    "bing.com",
+    "hotjar.com",
+    "hs-analytics.net",
+    "hs-scripts.com",
+    "hubspot.com",
+    "demdex.net",
+    "omtrdc.net",
+    "adobedtm.com",
+    "clarity.ms",
+    "newrelic.com",
+    "nr-data.net",
+    "twitter.com",
+    "ads-twitter.com",
+    "youtube.com",
+    "vimeo.com",
+    "qualtrics.com",
+    "6sc.co",
+    "bizible.com",
+    "pardot.com",
+}
+
+# Rough transfer sizes used to estimate what an aborted request would have cost.
+TYPICAL_SIZES = {
+    "image": 60_000,
+    "media": 500_000,
+    "font": 40_000,
+    "stylesheet": 30_000,
+    "script": 80_000,
+    "xhr": 10_000,
+    "fetch": 10_000,
+    "document": 50_000,
+    "other": 5_000,
+}
+
+
+def host_matches(host, domains):
+    return any(host == domain or host.endswith("." + domain) for domain in domains)
+
+
+class BlockStats:
+    def __init__(self, url):
+        self.url = url
+        self.allowed = 0
+        self.blocked = 0
+        self.bytes_loaded = 0
+        self.bytes_saved_estimate = 0
+        self.blocked_types = {}
+
+    def record_blocked(self, resource_type):
+        self.blocked += 1
+        self.bytes_saved_estimate += TYPICAL_SIZES.get(resource_type, TYPICAL_SIZES["other"])
+        self.blocked_types[resource_type] = self.blocked_types.get(resource_type, 0) + 1
+
+    def as_dict(self):
+        return {
+            "url": self.url,
+            "allowed": self.allowed,
+            "blocked": self.blocked,
+            "bytes_loaded": self.bytes_loaded,
+            "bytes_saved_estimate": self.bytes_saved_estimate,
+            "blocked_types": dict(self.blocked_types),
+        }
+
+
+class ResourceBlocker:
+    """
+    Route-based request filter for Playwright pages.
+
+    `allow_types`, when given, is a whitelist of resource types and takes precedence over
+    `block_types`. `allow_domains` always wins over `block_domains`. The main-frame
+    navigation is never blocked.
+    """
+
+    def __init__(self, block_types=None, allow_types=None, block_domains=None, allow_domains=None):
+        self.block_types = set(block_types or ())
+        self.allow_types = set(allow_types) if allow_types is not None else None
+        self.block_domains = set(block_domains or ())
+        self.allow_domains = set(allow_domains or ())
+
+    def should_block(self, resource_type, url):
+        host = urlparse(url).hostname or ""
+        if host_matches(host, self.allow_domains):
+            return False
+        if host_matches(host, self.block_domains):
+            return True
+        if self.allow_types is not None:
+            return resource_type not in self.allow_types
+        return resource_type in self.block_types
+
+    async def attach(self, page, url):
+        stats = BlockStats(url)
+
+        async def handle(route):
+            request = route.request
+            is_main_navigation = request.is_navigation_request() and request.frame.parent_frame is None
+            if not is_main_navigation and self.should_block(request.resource_type, request.url):
+                stats.record_blocked(request.resource_type)
+                await route.abort()
+            else:
+                stats.allowed += 1
+                await route.fallback()
+
+        async def on_finished(request):
+            try:
+                sizes = await request.sizes()
+            except Exception:
+                return
+            stats.bytes_loaded += sizes["responseBodySize"] + sizes["responseHeadersSize"]
+
+        await page.route("**/*", handle)
+        page.on("requestfinished", on_finished)
+        return stats
+
+
+PROFILES = {
+    "none": None,
+    # Everything but images, video and webfonts; trackers and ads are dropped.
+    "default": ResourceBlocker(block_types={"image", "media", "font"}, block_domains=TRACKER_DOMAINS),
+    # Card grids rendered client-side: keep the document, its scripts, the XHR/fetch calls
+    # that fill the grid and the stylesheets that drive visibility checks on buttons.
+    "listing": ResourceBlocker(allow_types={"document", "script", "xhr", "fetch", "stylesheet"}, block_domains=TRACKER_DOMAINS),
+    # Server-rendered pages where only the HTML matters.
+    "text": ResourceBlocker(allow_types={"document"}),
+}
+
+
+def get_blocker(profile):
+    if profile is None or isinstance(profile, ResourceBlocker):
+        return profile
+    return PROFILES[profile]
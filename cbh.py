@@ -2,69 +2,84 @@ import asyncio
 import re
 from typing import Literal
 
-import pandas as pd
-from bs4 import BeautifulSoup
-
+from parse_pool import default_pool
+from parsers import make_tree
+from records import ArticleRecord, collect, parse_date, records_frame
 from scraper import AsyncScraper
 from scraper_utils import check_months, clean
+from state_store import default_store
+
+
+def parse_cards(content, scope=None):
+    soup = make_tree(content, scope=scope)
+    results = soup.find("div", {"id": "SearchResults"})
+    articles = results.find_all("div", {"class": "insights-listing-block__card"}) if results else []
+    data = []
+    for i in articles:
+        title = i.find("div", {"class": "insights-listing-block__title"})
+        link = title.find("a").get("href")
+        category = clean(i.find("div", {"class": "insights-listing-block__category"}))
+        date = clean(i.find("div", {"class": "insights-listing-block__date"}))
+        desc = clean(i.find("div", {"class": "insights-listing-block__description"}))
+        try:
+            tags = [j.get("href").strip() for j in i.find("div", {"class": "insights-listing-block__badges"}).find_all("a")]
+        except AttributeError:
+            tags = []
+        data.append(ArticleRecord(link=link, title=clean(title), category=category, date=parse_date(date, "%B %d, %Y"), desc=desc, tags=tags))
+    return data
 
 
 class CBH:
-    def __init__(self, headless=True):
+    def __init__(self, headless=True, scraper=None):
+        self.name = "cbh"
         self.url = "https://www.cbh.com/insights/?p={}#SearchResults"
-        self.scraper = AsyncScraper(headless=headless)
+        self.scope = "div#SearchResults"
+        self.state = default_store
+        self.parse_pool = default_pool
+        self.scraper = scraper or AsyncScraper(headless=headless)
 
-    async def scrape_website(self, fetch: Literal["first", "6m", "12m", "all"]):
+    async def stream(self, fetch: Literal["first", "6m", "12m", "all", "new"] = "first"):
+        """Yields a list of ArticleRecords for each results page."""
+        async with self.scraper:
+            async for batch in self.scrape_website(fetch):
+                yield batch
+
+    async def scrape_website(self, fetch: Literal["first", "6m", "12m", "all", "new"]):
         page = 1
-        posts = []
         while True:
-            content = await self.scraper.scrape(self.url.format(page))
+            content = await self.scraper.scrape(self.url.format(page), scope=self.scope)
 
-            df = self.make_df(content)
-            if df is not None:
-                posts.append(df)
-            else:
+            batch = await self.parse(content)
+            if batch is None:
                 break
+            yield batch
 
             if fetch == "first":
                 break
             elif fetch == "all":
                 pass
+            elif fetch == "new":
+                if self.state.is_known(self.name, batch):
+                    break
             elif re.match(r"\b\d{1,2}m\b", fetch):
-                if check_months(df, fetch):
+                if check_months(batch, fetch):
                     break
             else:
                 break
 
             page += 1
-        return posts
 
-    def make_df(self, content):
-        soup = BeautifulSoup(content, "html.parser")
-        if "no results" in soup.text.lower():
-            return None
-        articles = soup.find("div", {"id": "SearchResults"}).find_all("div", {"class": "insights-listing-block__card"})
-        data = []
-        for i in articles:
-            title = i.find("div", {"class": "insights-listing-block__title"})
-            link = title.find("a").get("href")
-            category = clean(i.find("div", {"class": "insights-listing-block__category"}))
-            date = clean(i.find("div", {"class": "insights-listing-block__date"}))
-            desc = clean(i.find("div", {"class": "insights-listing-block__description"}))
-            try:
-                tags = [j.get("href").strip() for j in i.find("div", {"class": "insights-listing-block__badges"}).find_all("a")]
-            except AttributeError:
-                tags = []
-            data.append({"link": link, "title": clean(title), "category": category, "date": date, "desc": desc, "tags": tags})
+    async def parse(self, content):
+        return await self.parse_pool.run(parse_cards, content, self.scope) or None
 
-        df = pd.DataFrame(data)
-        df["date"] = pd.to_datetime(df["date"], format="%B %d, %Y")
-        return df
+    def make_df(self, content):
+        records = parse_cards(content, self.scope)
+        return records_frame(records) if records else None
 
-    async def execute(self, fetch: Literal["first", "6m", "12m", "all"] = "first"):
+    async def execute(self, fetch: Literal["first", "6m", "12m", "all", "new"] = "first"):
         print(f"---{self.url}", end="---")
-        posts = await self.scrape_website(fetch)
-        posts = pd.concat(posts)
+        posts = await collect(self.stream(fetch))
+        posts = self.state.record(self.name, posts, fetch)
         posts = posts.sort_values(by="date", ascending=False)
         print(len(posts))
         return posts
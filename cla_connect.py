@@ -1,61 +1,79 @@
 import re
-import time
 from typing import Literal
 
-import pandas as pd
-import requests
-
+from date_filter import DateFilter, window_start
+from http_client import AsyncHTTPClient
+from records import ArticleRecord, collect, parse_date
 from scraper_utils import check_months
+from state_store import default_store
 
 
 class ClaConnect:
-    def __init__(self):
+    def __init__(self, client=None):
+        self.name = "cla_connect"
         self.url = "https://www.claconnect.com/en/resources?pageNum=1"
         self.api_url = "https://www.claconnect.com/webapi/ResourcesApi/ResourceLandingSearch/?pageNum={}&loadAll=false&pageSize=20"
-        self.session = requests.Session()
-        self.session.headers.update({"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"})
+        self.state = default_store
+        # No server-side date filter; month windows are cut client-side
+        self.date_filter = DateFilter()
+        self.client = client or AsyncHTTPClient()
+
+    async def stream(self, fetch: Literal["first", "6m", "12m", "all", "new"] = "first"):
+        """Yields a list of ArticleRecords per API page."""
+        async with self.client:
+            async for batch in self.get_posts(fetch):
+                yield batch
 
-    def get_posts(self, fetch):
-        posts, count = [], 0
+    async def get_posts(self, fetch):
         page = 1
+        since = window_start(fetch)
 
         while True:
-            time.sleep(5)
-            response = self.session.get(self.api_url.format(page))
+            response = await self.client.get(self.api_url.format(page))
 
-            if response.status_code != 200:
-                return posts
+            if response.status != 200:
+                return
             data = response.json()["data"]
 
-            df = self.make_df(data)
-            posts.append(df)
-            count += len(df)
+            records = self.make_records(data)
+            batch = self.date_filter.apply(records, since)
+            yield batch
 
             if fetch == "first":
                 break
             elif fetch == "all":
                 if not data["hasMoreResources"]:
                     break
+            elif fetch == "new":
+                if self.state.is_known(self.name, batch):
+                    break
             elif re.match(r"\b\d{1,2}m\b", fetch):
-                if check_months(df, fetch):
+                if check_months(records, fetch):
                     break
             else:
                 break
-        page += 1
-        return posts
+            page += 1
 
-    def make_df(self, data):
-        df = pd.DataFrame(data["resources"])
-        df["url"] = "https://www.claconnect.com" + df["url"]
-        df = df.drop(["target", "image"], axis=1)
-        df = df.rename(columns={"abstractText": "desc", "type": "category"})
-        df["date"] = pd.to_datetime(df["date"], format="%m/%d/%Y")
-        return df
+    def make_records(self, data):
+        posts = []
+        for resource in data["resources"]:
+            resource = {key: value for key, value in resource.items() if key not in ("target", "image")}
+            posts.append(
+                ArticleRecord(
+                    link="https://www.claconnect.com" + resource.pop("url"),
+                    title=resource.pop("title", None),
+                    date=parse_date(resource.pop("date", None), "%m/%d/%Y"),
+                    desc=resource.pop("abstractText", None),
+                    category=resource.pop("type", None),
+                    extra=resource,
+                )
+            )
+        return posts
 
-    def execute(self, fetch: Literal["first", "6m", "12m", "all"] = "first"):
+    async def execute(self, fetch: Literal["first", "6m", "12m", "all", "new"] = "first"):
         print(f"---{self.url}", end="---")
-        posts = self.get_posts(fetch)
-        posts = pd.concat(posts)
+        posts = await collect(self.stream(fetch))
+        posts = self.state.record(self.name, posts, fetch)
         posts = posts.sort_values(by="date", ascending=False)
         print(len(posts))
         return posts
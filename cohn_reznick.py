@@ -1,33 +1,62 @@
 import re
 from typing import Literal
 
-import pandas as pd
-from bs4 import BeautifulSoup
-
+from parse_pool import default_pool
+from parsers import make_tree
+from pipeline import stream_batches
+from records import ArticleRecord, collect, parse_date, records_frame
 from scraper import AsyncScraper
 from scraper_utils import check_months, clean
+from state_store import default_store
+
+
+def parse_cards(content, scope=None):
+    soup = make_tree(content, scope=scope)
+    articles = soup.find("div", {"class": "searchArticlesListView"})
+    articles = articles.find_all("div", recursive=False)
+    data = []
+    for i in articles:
+        title = clean(i.find("div", {"class": "Title"}))
+        link = i.find("a").get("href")
+        date = clean(i.find("div", {"class": "publishDate"})).removeprefix("PublishedDate : ")
+        date = date.split(" at ")[0].strip()
+        desc = clean(i.find("div", {"class": "sc-blHHSb lhZsno"}))
+        try:
+            tags = [j.text.strip() for j in i.find("div", {"class": "Type"}).find_all("span")]
+        except AttributeError:
+            tags = []
+
+        data.append(ArticleRecord(link=link, title=title, date=parse_date(date, "%A, %B %d, %Y"), desc=desc, tags=tags))
+    return data
 
 
 class CohnReznick:
-    def __init__(self, headless=True):
+    def __init__(self, headless=True, scraper=None):
+        self.name = "cohn_reznick"
         self.url = "https://www.cohnreznick.com/insights"
-        self.scraper = AsyncScraper(headless=headless)
-        self.posts = []
+        self.state = default_store
+        self.parse_pool = default_pool
+        self.scraper = scraper or AsyncScraper(headless=headless)
+        self.scope = "div.searchArticlesListView"
+        self.card_selector = "div.searchArticlesListView > div"
 
-    async def show_more_posts(self, page, fetch: Literal["first", "6m", "12m", "all"]):
+    async def show_more_posts(self, page, fetch: Literal["first", "6m", "12m", "all", "new"], emit):
         page_num = 1
         while True:
-            await page.wait_for_selector("div.searchArticlesListView")
-            content = await page.content()
-            df = self.make_df(content)
-            self.posts.append(df)
+            await page.wait_for_selector(self.scope)
+            content = await self.scraper.outer_html(page, self.scope)
+            batch = await self.parse(content)
+            await emit(batch)
 
             if fetch == "first":
                 break
             elif fetch == "all":
                 pass
+            elif fetch == "new":
+                if self.state.is_known(self.name, batch):
+                    break
             elif re.match(r"\b\d{1,2}m\b", fetch):
-                if check_months(df, fetch):
+                if check_months(batch, fetch):
                     break
             else:
                 break
@@ -36,40 +65,38 @@ class CohnReznick:
 
             if not await page.is_visible(button_selector):
                 return
+            state = await self.scraper.waiter.snapshot(page, self.card_selector)
             await page.click(button_selector)
             page_num += 1
-            await page.wait_for_timeout(2000)
+            if await self.scraper.waiter.wait(page, self.card_selector, state) == "timeout":
+                return
+
+    async def parse(self, content):
+        return await self.parse_pool.run(parse_cards, content, self.scope)
 
     def make_df(self, content):
-        soup = BeautifulSoup(content, "html.parser")
-        articles = soup.find("div", {"class": "searchArticlesListView"})
-        articles = articles.find_all("div", recursive=False)
-        data = []
-        for i in articles:
-            title = clean(i.find("div", {"class": "Title"}))
-            link = i.find("a").get("href")
-            date = clean(i.find("div", {"class": "publishDate"})).removeprefix("PublishedDate : ")
-            date = date.split(" at ")[0].strip()
-            desc = clean(i.find("div", {"class": "sc-blHHSb lhZsno"}))
-            try:
-                tags = [j.text.strip() for j in i.find("div", {"class": "Type"}).find_all("span")]
-            except AttributeError:
-                tags = []
-
-            data.append({"link": link, "title": title, "date": date, "desc": desc, "tags": tags})
-
-        df = pd.DataFrame(data)
-        df["date"] = pd.to_datetime(df["date"], format="%A, %B %d, %Y")
-        return df
-
-    async def execute(self, fetch: Literal["first", "6m", "12m", "all"] = "first"):
+        return records_frame(parse_cards(content, self.scope))
+
+    async def stream(self, fetch: Literal["first", "6m", "12m", "all", "new"] = "first"):
+        """Yields a list of ArticleRecords for each batch of cards as the listing is paged through."""
+
+        def crawl(emit):
+            return self.scraper.scrape(
+                self.url,
+                custom_function=self.show_more_posts,
+                block="listing",
+                fetch=fetch,
+                emit=emit,
+            )
+
+        async with self.scraper:
+            async for batch in stream_batches(crawl):
+                yield batch
+
+    async def execute(self, fetch: Literal["first", "6m", "12m", "all", "new"] = "first"):
         print(f"---{self.url}", end="---")
-        await self.scraper.scrape(
-            self.url,
-            custom_function=self.show_more_posts,
-            fetch=fetch,
-        )
-        posts = pd.concat(self.posts)
+        posts = await collect(self.stream(fetch))
+        posts = self.state.record(self.name, posts, fetch)
         posts = posts.sort_values(by="date", ascending=False)
         print(len(posts))
         return posts
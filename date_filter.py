@@ -0,0 +1,57 @@
+import re
+from datetime import datetime, timedelta
+from urllib.parse import quote, urlencode
+
+WINDOW = re.compile(r"(\d{1,2})m")
+
+
+def window_start(fetch, now=None):
+    """Start of a "6m"-style fetch window (30-day months, as in check_months), or None for the other fetch modes."""
+    match = WINDOW.fullmatch(fetch)
+    if not match:
+        return None
+    return (now or datetime.now()) - timedelta(days=int(match.group(1)) * 30)
+
+
+class DateFilter:
+    """
+    How a source applies a `since` date. The base class has no server-side support: `query`
+    adds nothing and `apply` drops records dated before `since` once a page is downloaded.
+    Subclasses with `pushdown = True` turn `since` into query parameters the API filters on,
+    so pages past the window are never fetched. `apply` still cuts their pages on the client,
+    because the server may filter on a different date than the one the listing shows.
+    """
+
+    pushdown = False
+
+    def query(self, since):
+        return ""
+
+    def cutoff(self, records, since):
+        return [record for record in records if record.date is None or record.date >= since]
+
+    def apply(self, records, since):
+        if since is None:
+            return records
+        return self.cutoff(records, since)
+
+
+class SolrDateFilter(DateFilter):
+    """Solr range filter query, e.g. `fq=pwcSortDate_dt:[2024-01-01T00:00:00Z TO *]`."""
+
+    pushdown = True
+
+    def __init__(self, field):
+        self.field = field
+
+    def query(self, since):
+        return "&fq=" + quote(f"{self.field}:[{since:%Y-%m-%dT%H:%M:%SZ} TO *]")
+
+
+class WordPressDateFilter(DateFilter):
+    """WordPress REST API `after=` parameter (ISO 8601, compared with the post date)."""
+
+    pushdown = True
+
+    def query(self, since):
+        return "&" + urlencode({"after": since.strftime("%Y-%m-%dT%H:%M:%S")})
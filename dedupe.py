@@ -0,0 +1,110 @@
+import random
+import re
+from array import array
+from collections import OrderedDict
+from hashlib import blake2b
+
+WORD = re.compile(r"\w+")
+PRIME = (1 << 61) - 1
+MAX_HASH = (1 << 64) - 1
+
+
+def shingles(text, size=5):
+    """Word `size`-grams of the lowercased text; short texts give a single shingle."""
+    words = WORD.findall(text.lower())
+    if len(words) <= size:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i : i + size]) for i in range(len(words) - size + 1)}
+
+
+class NearDuplicateIndex:
+    """
+    Corpus-level near-duplicate detection with MinHash signatures and LSH banding.
+
+    Each text is reduced to `num_perm` minimum hashes over its word shingles; the signature is
+    cut into `bands` bands and texts sharing any band are compared on their signatures, which
+    estimate the Jaccard similarity of the shingle sets. Candidates at or above `threshold`
+    are duplicates. Only signatures are kept (8 bytes per permutation) and the index holds at
+    most `max_items` of them, evicting the least recently matched or added first.
+    """
+
+    def __init__(self, threshold=0.8, num_perm=64, bands=16, shingle_size=5, max_items=20000, seed=1):
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be a multiple of bands ({bands})")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.max_items = max_items
+        rng = random.Random(seed)
+        self.perms = [(rng.randrange(1, PRIME), rng.randrange(0, PRIME)) for _ in range(num_perm)]
+        self.signatures = OrderedDict()
+        self.buckets = [{} for _ in range(bands)]
+
+    def __len__(self):
+        return len(self.signatures)
+
+    def __contains__(self, key):
+        return key in self.signatures
+
+    def signature(self, text):
+        hashes = [int.from_bytes(blake2b(shingle.encode(), digest_size=8).digest(), "little") for shingle in shingles(text, self.shingle_size)]
+        if not hashes:
+            return array("Q", [MAX_HASH] * self.num_perm)
+        return array("Q", [min((a * h + b) % PRIME for h in hashes) for a, b in self.perms])
+
+    def band_keys(self, signature):
+        return [signature[i * self.rows : (i + 1) * self.rows].tobytes() for i in range(self.bands)]
+
+    def similarity(self, first, second):
+        return sum(x == y for x, y in zip(first, second)) / self.num_perm
+
+    def query(self, text=None, signature=None):
+        """Returns `(key, similarity)` of the closest indexed text at or above the threshold, or None."""
+        if signature is None:
+            signature = self.signature(text)
+        candidates = set()
+        for bucket, band in zip(self.buckets, self.band_keys(signature)):
+            candidates.update(bucket.get(band, ()))
+
+        best = None
+        for key in candidates:
+            score = self.similarity(signature, self.signatures[key])
+            if score >= self.threshold and (best is None or score > best[1]):
+                best = (key, score)
+        if best:
+            self.signatures.move_to_end(best[0])
+        return best
+
+    def add(self, key, text=None, signature=None):
+        if signature is None:
+            signature = self.signature(text)
+        if key in self.signatures:
+            self.remove(key)
+        self.signatures[key] = signature
+        for bucket, band in zip(self.buckets, self.band_keys(signature)):
+            bucket.setdefault(band, set()).add(key)
+        while len(self.signatures) > self.max_items:
+            self.remove(next(iter(self.signatures)))
+
+    def remove(self, key):
+        signature = self.signatures.pop(key)
+        for bucket, band in zip(self.buckets, self.band_keys(signature)):
+            keys = bucket[band]
+            keys.discard(key)
+            if not keys:
+                del bucket[band]
+
+    def check(self, key, text):
+        """
+        Returns the key of an already indexed near-duplicate of `text`, or None after adding
+        `text` under `key`. Duplicates are not indexed, so the first version seen stays the
+        reference.
+        """
+        signature = self.signature(text)
+        match = self.query(signature=signature)
+        if match and match[0] != key:
+            return match[0]
+        self.add(key, signature=signature)
+        return None
@@ -1,55 +1,68 @@
 import re
 from typing import Literal
 
-import pandas as pd
-import requests
-
+from date_filter import DateFilter, window_start
+from http_client import AsyncHTTPClient
+from records import ArticleRecord, collect, parse_date
 from scraper_utils import check_months
+from state_store import default_store
 
 
 class EisnerRamper:
-    def __init__(self):
+    def __init__(self, client=None):
+        self.name = "eisner_ramper"
         self.url = "https://www.eisneramper.com/InsightsListing/Load?pageId=35885&page={}&loadAll=true"
         self.search_url = "https://www.eisneramper.com/InsightsListing/Load?pageId=35885&page={}&loadAll=true&searchTerm=finance"
+        self.state = default_store
+        # No server-side date filter; month windows are cut client-side
+        self.date_filter = DateFilter()
+        self.client = client or AsyncHTTPClient()
+
+    async def stream(self, fetch: Literal["first", "6m", "12m", "all", "new"] = "first"):
+        """Yields a list of ArticleRecords per API page."""
+        async with self.client:
+            async for batch in self.get_posts(fetch):
+                yield batch
 
-    def get_posts(self, fetch):
+    async def get_posts(self, fetch):
         page = 1
-        posts = []
+        since = window_start(fetch)
 
         while True:
-            response = requests.get(self.url.format(page))
-            if response.status_code != 200:
+            response = await self.client.get(self.url.format(page))
+            if response.status != 200:
                 break
 
             data = response.json()
             if not int(data["paging"]["recordsPerPage"]):
                 break
 
-            df = self.make_df(data["items"])
-            posts.append(df)
+            records = self.make_records(data["items"])
+            batch = self.date_filter.apply(records, since)
+            yield batch
 
             if fetch == "first":
                 break
             elif fetch == "all":
                 pass
+            elif fetch == "new":
+                if self.state.is_known(self.name, batch):
+                    break
             elif re.match(r"\b\d{1,2}m\b", fetch):
-                if check_months(df, fetch):
+                if check_months(records, fetch):
                     break
             else:
                 break
 
             page += 1
-        return posts
 
-    def make_df(self, posts):
-        df = pd.DataFrame(posts)[["title", "link", "displayDate"]]
-        df["link"] = "https://www.eisneramper.com" + df["link"]
-        return df
+    def make_records(self, posts):
+        return [ArticleRecord(link="https://www.eisneramper.com" + post["link"], title=post["title"], date=parse_date(post["displayDate"])) for post in posts]
 
-    async def execute(self, fetch: Literal["first", "6m", "12m", "all"] = "first"):
+    async def execute(self, fetch: Literal["first", "6m", "12m", "all", "new"] = "first"):
         print(f"---{self.url}", end="---")
-        posts = self.get_posts(fetch)
-        posts = pd.concat(posts)
+        posts = await collect(self.stream(fetch))
+        posts = self.state.record(self.name, posts, fetch)
         posts = posts.sort_values(by="date", ascending=False)
         print(len(posts))
         return posts
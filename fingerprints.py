@@ -0,0 +1,70 @@
+import hashlib
+import os
+import re
+import sqlite3
+import time
+import unicodedata
+
+WHITESPACE = re.compile(r"\s+")
+
+NEW = "new"
+CHANGED = "changed"
+UNCHANGED = "unchanged"
+
+
+def fingerprint(text):
+    """SHA-256 of the text after NFKC normalization and whitespace collapsing, so re-renders that only reflow the markup hash the same."""
+    text = WHITESPACE.sub(" ", unicodedata.normalize("NFKC", text)).strip()
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+class FingerprintStore:
+    """
+    Persistent URL -> content fingerprint index. `check(url, text)` reports whether an article
+    is new, changed or unchanged since the last run and records it; callers skip downstream
+    work (dedupe, storage, images) for unchanged ones. Every sighting updates `last_seen`,
+    and `changed_at` moves only when the fingerprint does.
+    """
+
+    def __init__(self, path=".cache/fingerprints.sqlite"):
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.db = sqlite3.connect(path)
+        self.db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS fingerprints (
+                url TEXT PRIMARY KEY,
+                hash TEXT NOT NULL,
+                first_seen REAL NOT NULL,
+                last_seen REAL NOT NULL,
+                changed_at REAL NOT NULL
+            )
+            """
+        )
+        self.db.commit()
+
+    def get(self, url):
+        row = self.db.execute("SELECT hash FROM fingerprints WHERE url = ?", (url,)).fetchone()
+        return row[0] if row else None
+
+    def record(self, url, digest):
+        now = time.time()
+        previous = self.get(url)
+        if previous is None:
+            status = NEW
+            self.db.execute("INSERT INTO fingerprints VALUES (?, ?, ?, ?, ?)", (url, digest, now, now, now))
+        elif previous != digest:
+            status = CHANGED
+            self.db.execute("UPDATE fingerprints SET hash = ?, last_seen = ?, changed_at = ? WHERE url = ?", (digest, now, now, url))
+        else:
+            status = UNCHANGED
+            self.db.execute("UPDATE fingerprints SET last_seen = ? WHERE url = ?", (now, url))
+        self.db.commit()
+        return status
+
+    def check(self, url, text):
+        return self.record(url, fingerprint(text))
+
+    def close(self):
+        self.db.close()
@@ -1,17 +1,49 @@
 import asyncio
+import html
 import re
 from datetime import datetime
 from typing import Literal
 
-import pandas as pd
-from bs4 import BeautifulSoup
+import aiohttp
 
+from http_client import AsyncHTTPClient
+from parse_pool import default_pool
+from parsers import make_soup, make_tree
+from pipeline import ArticlePipeline, stream_batches
+from records import ArticleRecord, collect, parse_date
 from scraper import AsyncScraper
-from scraper_utils import clean
+from scraper_utils import CardTracker, clean
+from state_store import default_store
+
+
+DATE_PROBE = re.compile(rb'<time[^>]*cmp-hero-banner__article-date[^>]*>([^<]*)</time>')
+
+
+def parse_cards(content):
+    soup = make_tree(content)
+    articles = soup.find_all("div", {"class": "coveo-card-layout CoveoResult"})
+    data = []
+    for i in articles:
+        link = i.find("a").get("href")
+        title = clean(i.find("h5", {"class": "cmp-search__result-title"}))
+        category = clean(i.find("p", {"class": "cmp-search__result-category"}))
+        if category == "SURVEY REPORT":
+            continue
+        data.append(ArticleRecord(link=link, title=title, category=category))
+    return data
+
+
+def parse_article(content):
+    soup = make_soup(content)
+    date = clean(soup.find("time", {"class": "cmp-hero-banner__article-date"}))
+    divs = soup.find_all("div", {"class": "section aem-GridColumn aem-GridColumn--default--12"})
+    text = "\n".join([clean(i) for i in divs])
+    return date, text
 
 
 class GrantThornton:
-    def __init__(self, headless=True):
+    def __init__(self, headless=True, scraper=None, client=None):
+        self.name = "grant_thornton"
         self.urls = [
             "https://grantthornton.com/insights/audit-committee",
             "https://grantthornton.com/insights/dc-dispatch",
@@ -19,48 +51,82 @@ class GrantThornton:
             "https://grantthornton.com/insights/growth-insights",
             "https://grantthornton.com/insights/work-place-evolution",
         ]
-        self.scraper = AsyncScraper(headless=headless)
-
-    async def show_more_posts(self, page, fetch: Literal["first", "6m", "12m", "all"]):
+        self.card_selector = "div.coveo-card-layout.CoveoResult"
+        self.state = default_store
+        self.parse_pool = default_pool
+        # Optional NearDuplicateIndex used to skip syndicated article bodies
+        self.dedupe = None
+        # Optional FingerprintStore; unchanged article bodies are not re-emitted
+        self.fingerprints = None
+        self.scraper = scraper or AsyncScraper(headless=headless)
+        self.client = client or AsyncHTTPClient()
+        # The last few articles seen, for the month check
+        self.articles = []
+        # link -> {"date": ..., "text": ...}, shared by the month check and the body fetch
+        self.article_meta = {}
+
+    async def show_more_posts(self, page, fetch: Literal["first", "6m", "12m", "all", "new"], emit):
         cookie_button_selector = "#onetrust-accept-btn-handler"
         if await page.is_visible(cookie_button_selector):
             await page.click(cookie_button_selector)
 
         button_selector = "button.cmp-button:has-text('Show More')"
+        tracker = CardTracker(self.card_selector)
 
         clicks = 0
         while True:
+            batch = []
+            content = await tracker.new_cards(page)
+            if content:
+                batch = tracker.fresh(await self.extract_articles(content))
+                await self.emit_batch(batch, emit)
+
             if fetch == "first":
                 break
             elif fetch == "all":
                 pass
+            elif fetch == "new":
+                if self.state.is_known(self.name, batch):
+                    break
             elif re.match(r"\b\d{1,2}m\b", fetch):
-                content = await page.content()
-                if await self.check_months(content, fetch):
+                if await self.check_months(fetch, page.context):
                     break
             else:
                 break
 
-            if not await page.is_visible(button_selector):
-                return
-            await page.click(button_selector)
+            if not await self.click_show_more(page, button_selector):
+                break
             clicks += 1
-            await page.wait_for_timeout(2000)
 
-            if not await page.is_visible(button_selector):
-                return
-            await page.click(button_selector)
+            if not await self.click_show_more(page, button_selector):
+                break
             clicks += 1
-            await page.wait_for_timeout(2000)
 
-    async def check_months(self, content, fetch):
+        content = await tracker.new_cards(page)
+        if content:
+            await self.emit_batch(tracker.fresh(await self.extract_articles(content)), emit)
+
+    async def emit_batch(self, batch, emit):
+        if batch:
+            self.articles = (self.articles + batch)[-3:]
+            await emit(batch)
+
+    async def click_show_more(self, page, button_selector):
+        if not await page.is_visible(button_selector):
+            return False
+        state = await self.scraper.waiter.snapshot(page, self.card_selector)
+        await page.click(button_selector)
+        return await self.scraper.waiter.wait(page, self.card_selector, state) != "timeout"
+
+    async def check_months(self, fetch, context=None):
         months = int(fetch[:-1])
-        for i in range(-1, -4, -1):
-            articles = await self.extract_articles(content)
-            last_url = articles[i]["link"]
-            date, text = await self.scrape_article(last_url)
+        date = None
+        for article in self.articles[-1:-4:-1]:
+            date = await self.article_date(article.link, context)
             if date:
                 break
+        if not date:
+            return False
 
         date = datetime.strptime(date, "%B %d, %Y")
 
@@ -73,42 +139,85 @@ class GrantThornton:
         return False
 
     async def extract_articles(self, content, text=False):
-        soup = BeautifulSoup(content, "html.parser")
-        articles = soup.find_all("div", {"class": "coveo-card-layout CoveoResult"})
-        data = []
-        for i in articles:
-            link = i.find("a").get("href")
-            title = clean(i.find("h5", {"class": "cmp-search__result-title"}))
-            category = clean(i.find("p", {"class": "cmp-search__result-category"}))
-            if category == "SURVEY REPORT":
-                continue
-            if text:
-                date, text = await self.scrape_article(link)
-                data.append({"link": link, "title": title, "category": category, "date": date, "text": text})
-            else:
-                data.append({"link": link, "title": title, "category": category})
+        data = await self.parse_pool.run(parse_cards, content)
+        if text:
+            articles = {article.link: article for article in data}
+            async for link, (date, body) in self.scrape_articles(articles):
+                articles[link].date = parse_date(date, "%B %d, %Y")
+                articles[link].extra = {"text": body}
         return data
 
-    async def scrape_article(self, url):
-        content = await self.scraper.scrape(url)
-        soup = BeautifulSoup(content, "html.parser")
-        date = clean(soup.find("time", {"class": "cmp-hero-banner__article-date"}))
-        divs = soup.find_all("div", {"class": "section aem-GridColumn aem-GridColumn--default--12"})
-        text = "\n".join([clean(i) for i in divs])
+    async def scrape_articles(self, links, workers=None):
+        pipeline = ArticlePipeline(self.scrape_article, workers or self.scraper.max_concurrent, dedupe=self.dedupe, fingerprints=self.fingerprints, text=lambda result: result[1])
+        # One use of the scraper for the whole run keeps the pool up between fetches
+        async with self.scraper, self.client:
+            async for link, result in pipeline.stream(links):
+                yield link, result
+
+    async def article_date(self, url, context=None):
+        meta = self.article_meta.setdefault(url, {})
+        if "date" not in meta:
+            # The probe is only a shortcut; any failure falls back to loading the article
+            try:
+                response = await self.client.get_prefix(url, until=DATE_PROBE)
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                response = None
+            match = DATE_PROBE.search(response.body) if response is not None and response.status == 200 else None
+            if match:
+                meta["date"] = html.unescape(match.group(1).decode("utf-8", errors="replace")).strip()
+            else:
+                await self.scrape_article(url, context)
+        return meta.get("date")
+
+    async def scrape_article(self, url, context=None):
+        # From the show-more loop, `context` is the listing page's browser context: asking the
+        # pool for a second page while the listing holds a slot would wait forever when the
+        # page budget is 1.
+        meta = self.article_meta.setdefault(url, {})
+        if "text" in meta:
+            return meta.get("date"), meta["text"]
+
+        if context is None:
+            content = await self.scraper.scrape(url)
+        else:
+            content = await self.scrape_in_context(context, url)
+        date, text = await self.parse_pool.run(parse_article, content)
+        meta.update(date=date, text=text)
         return date, text
 
-    async def execute(self, url=None, fetch: Literal["first", "6m", "12m", "all"] = "first"):
+    async def scrape_in_context(self, context, url):
+        page = await context.new_page()
+        try:
+            await self.scraper.rate_limiter.acquire(url)
+            await page.goto(url)
+            await page.wait_for_selector("body")
+            return await page.content()
+        finally:
+            await page.close()
+
+    async def stream(self, url=None, fetch: Literal["first", "6m", "12m", "all", "new"] = "first"):
+        """Yields a list of ArticleRecords for each batch of cards as the listings are paged through."""
         urls = [url] if url else self.urls
-        posts = []
-        for url in urls:
-            print(f"---{url}", end="---")
-            content = await self.scraper.scrape(
+
+        def crawl(url):
+            return lambda emit: self.scraper.scrape(
                 url,
                 custom_function=self.show_more_posts,
+                block="listing",
                 fetch=fetch,
+                emit=emit,
             )
-            posts.extend(await self.extract_articles(content))
-        posts = pd.DataFrame(posts)
+
+        async with self.scraper, self.client:
+            for url in urls:
+                print(f"---{url}", end="---")
+                self.articles = []
+                async for df in stream_batches(crawl(url)):
+                    yield df
+
+    async def execute(self, url=None, fetch: Literal["first", "6m", "12m", "all", "new"] = "first"):
+        posts = await collect(self.stream(url, fetch))
+        posts = self.state.record(self.name, posts, fetch)
         posts = posts.sort_values(by="date", ascending=False)
         print(len(posts))
         return posts
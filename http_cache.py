@@ -0,0 +1,201 @@
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from urllib.parse import urlparse
+
+VARY_HEADERS = ("accept", "accept-language")
+# Bodies are stored decoded, so transfer-level headers must not be replayed.
+DROP_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection"}
+
+
+class CacheEntry:
+    def __init__(self, key, url, status, headers, body, stored_at):
+        self.key = key
+        self.url = url
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.stored_at = stored_at
+
+    @property
+    def etag(self):
+        return self.headers.get("etag")
+
+    @property
+    def last_modified(self):
+        return self.headers.get("last-modified")
+
+
+class HTTPCache:
+    """
+    On-disk response cache shared by AsyncHTTPClient and AsyncScraper.
+
+    Entries are keyed by URL plus the request headers in VARY_HEADERS. An entry younger than
+    its TTL is served without a request; older entries are revalidated with If-None-Match /
+    If-Modified-Since and reused on 304. `ttl` maps a domain or URL prefix to seconds
+    (longest match wins, `default_ttl` otherwise). Bodies live in files next to a SQLite
+    index; the least recently used entries are evicted once the total exceeds `max_bytes`.
+    """
+
+    def __init__(self, path=".cache/http", max_bytes=512 * 1024 * 1024, ttl=None, default_ttl=0):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl = ttl or {}
+        self.default_ttl = default_ttl
+        os.makedirs(path, exist_ok=True)
+        self.db = sqlite3.connect(os.path.join(path, "index.sqlite"))
+        self.db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                status INTEGER NOT NULL,
+                headers TEXT NOT NULL,
+                stored_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                size INTEGER NOT NULL
+            )
+            """
+        )
+        self.db.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed_at)")
+        self.db.commit()
+        # key -> last access, written in one batch by store, evict and close instead of a
+        # commit per lookup
+        self.accessed = {}
+
+    def key(self, url, headers=None):
+        headers = {k.lower(): v for k, v in (headers or {}).items()}
+        vary = "\n".join(f"{name}:{headers.get(name, '')}" for name in VARY_HEADERS)
+        return hashlib.sha256(f"{url}\n{vary}".encode()).hexdigest()
+
+    def body_path(self, key):
+        return os.path.join(self.path, key[:2], key)
+
+    def ttl_for(self, url):
+        host = urlparse(url).hostname or ""
+        best, ttl = -1, self.default_ttl
+        for pattern, seconds in self.ttl.items():
+            if "/" in pattern:
+                matched = url.startswith(pattern)
+            else:
+                matched = host == pattern or host.endswith("." + pattern)
+            if matched and len(pattern) > best:
+                best, ttl = len(pattern), seconds
+        return ttl
+
+    def lookup(self, url, headers=None):
+        key = self.key(url, headers)
+        row = self.db.execute("SELECT status, headers, stored_at FROM entries WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        try:
+            with open(self.body_path(key), "rb") as file:
+                body = file.read()
+        except FileNotFoundError:
+            self.delete(key)
+            return None
+
+        self.accessed[key] = time.time()
+        status, response_headers, stored_at = row
+        return CacheEntry(key, url, status, json.loads(response_headers), body, stored_at)
+
+    def is_fresh(self, entry):
+        return time.time() - entry.stored_at < self.ttl_for(entry.url)
+
+    def conditional_headers(self, entry):
+        headers = {}
+        if entry is None:
+            return headers
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    def cacheable(self, status, headers):
+        return status == 200 and "no-store" not in headers.get("cache-control", "")
+
+    def store(self, url, request_headers, status, headers, body):
+        headers = {k.lower(): v for k, v in dict(headers).items() if k.lower() not in DROP_HEADERS}
+        if not self.cacheable(status, headers):
+            return
+        key = self.key(url, request_headers)
+        path = self.body_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as file:
+            file.write(body)
+
+        now = time.time()
+        self.db.execute(
+            "INSERT OR REPLACE INTO entries (key, url, status, headers, stored_at, accessed_at, size) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (key, url, status, json.dumps(headers), now, now, len(body)),
+        )
+        self.flush_accessed()
+        self.db.commit()
+        self.evict()
+
+    def revalidated(self, entry):
+        entry.stored_at = time.time()
+        self.db.execute("UPDATE entries SET stored_at = ?, accessed_at = ? WHERE key = ?", (entry.stored_at, entry.stored_at, entry.key))
+        self.db.commit()
+
+    def flush_accessed(self):
+        if self.accessed:
+            self.db.executemany("UPDATE entries SET accessed_at = ? WHERE key = ?", [(accessed_at, key) for key, accessed_at in self.accessed.items()])
+            self.accessed = {}
+
+    def delete(self, key):
+        self.accessed.pop(key, None)
+        self.db.execute("DELETE FROM entries WHERE key = ?", (key,))
+        self.db.commit()
+        try:
+            os.remove(self.body_path(key))
+        except FileNotFoundError:
+            pass
+
+    def size(self):
+        return self.db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    def evict(self):
+        self.flush_accessed()
+        total = self.size()
+        if total <= self.max_bytes:
+            return
+        for key, size in self.db.execute("SELECT key, size FROM entries ORDER BY accessed_at").fetchall():
+            self.delete(key)
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def close(self):
+        self.flush_accessed()
+        self.db.commit()
+        self.db.close()
+
+    async def attach(self, page, resource_types=("document", "xhr", "fetch")):
+        """Serves GET navigations and XHR/fetch calls of a Playwright page through the cache."""
+
+        async def handle(route):
+            request = route.request
+            if request.method != "GET" or request.resource_type not in resource_types:
+                await route.fallback()
+                return
+
+            entry = self.lookup(request.url, request.headers)
+            if entry and self.is_fresh(entry):
+                await route.fulfill(status=entry.status, headers=entry.headers, body=entry.body)
+                return
+
+            response = await route.fetch(headers={**request.headers, **self.conditional_headers(entry)})
+            if entry and response.status == 304:
+                self.revalidated(entry)
+                await route.fulfill(status=entry.status, headers=entry.headers, body=entry.body)
+                return
+
+            body = await response.body()
+            self.store(request.url, request.headers, response.status, response.headers, body)
+            await route.fulfill(response=response, body=body)
+
+        await page.route("**/*", handle)
@@ -0,0 +1,121 @@
+import asyncio
+import json
+
+import aiohttp
+
+from rate_limit import default_limiter
+
+try:
+    import brotli  # noqa: F401
+
+    ACCEPT_ENCODING = "gzip, deflate, br"
+except ImportError:
+    ACCEPT_ENCODING = "gzip, deflate"
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+
+
+class HTTPResponse:
+    def __init__(self, url, status, headers, body):
+        self.url = url
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+    def json(self):
+        return json.loads(self.body)
+
+    def text(self):
+        return self.body.decode("utf-8", errors="replace")
+
+
+class AsyncHTTPClient:
+    """
+    Shared aiohttp session for the JSON API sources: pooled keep-alive connections per host,
+    compressed transfers, a total timeout per request and a global concurrency limit.
+    Requests are paced per domain by `rate_limiter` (the limiter shared with AsyncScraper by default)
+    and, when an HTTPCache is given, served or conditionally revalidated through it.
+    The session is opened lazily and closed when the last `async with` user exits.
+    """
+
+    def __init__(self, max_concurrent=10, limit_per_host=4, timeout=30, headers=None, rate_limiter=None, cache=None):
+        self.max_concurrent = max_concurrent
+        self.limit_per_host = limit_per_host
+        self.timeout = timeout
+        self.headers = {"User-Agent": USER_AGENT, "Accept-Encoding": ACCEPT_ENCODING}
+        self.headers.update(headers or {})
+        self.semaphore = asyncio.Semaphore(max_concurrent)
+        self.rate_limiter = rate_limiter or default_limiter
+        self.cache = cache
+        self.session = None
+        self.users = 0
+
+    async def __aenter__(self):
+        self.users += 1
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc):
+        self.users -= 1
+        if self.users <= 0:
+            self.users = 0
+            await self.close()
+
+    async def start(self):
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.max_concurrent,
+                limit_per_host=self.limit_per_host,
+                keepalive_timeout=30,
+                ttl_dns_cache=300,
+            )
+            self.session = aiohttp.ClientSession(
+                connector=connector,
+                headers=self.headers,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+        return self
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def get(self, url, headers=None, **kwargs):
+        entry = self.cache.lookup(url, headers) if self.cache else None
+        if entry and self.cache.is_fresh(entry):
+            return HTTPResponse(url, entry.status, entry.headers, entry.body)
+
+        await self.start()
+        request_headers = {**(headers or {}), **(self.cache.conditional_headers(entry) if entry else {})}
+        async with self.semaphore:
+            # Paced inside the slot: a token taken while queueing for it would be spent by the
+            # time the request goes out
+            await self.rate_limiter.acquire(url)
+            async with self.session.get(url, headers=request_headers, **kwargs) as response:
+                body = await response.read()
+        self.rate_limiter.feedback(url, response.status, response.headers.get("Retry-After"))
+
+        if entry and response.status == 304:
+            self.cache.revalidated(entry)
+            return HTTPResponse(url, entry.status, entry.headers, entry.body)
+        if self.cache:
+            self.cache.store(url, headers, response.status, response.headers, body)
+        return HTTPResponse(str(response.url), response.status, response.headers, body)
+
+    async def get_prefix(self, url, until=None, max_bytes=64 * 1024, headers=None):
+        """
+        Reads only the start of a response body: stops once the compiled bytes pattern `until`
+        matches or `max_bytes` have been read, then drops the connection. Bypasses the cache.
+        """
+        await self.start()
+        body = b""
+        async with self.semaphore:
+            await self.rate_limiter.acquire(url)
+            async with self.session.get(url, headers=headers) as response:
+                async for chunk in response.content.iter_chunked(8192):
+                    body += chunk
+                    if len(body) >= max_bytes or (until is not None and until.search(body)):
+                        break
+        self.rate_limiter.feedback(url, response.status, response.headers.get("Retry-After"))
+        return HTTPResponse(str(response.url), response.status, response.headers, body)
@@ -1,33 +1,55 @@
 import re
 from typing import Literal
 
-import pandas as pd
-from bs4 import BeautifulSoup
-
+from parse_pool import default_pool
+from parsers import make_tree
+from pipeline import stream_batches
+from records import ArticleRecord, collect, parse_date, records_frame
 from scraper import AsyncScraper
 from scraper_utils import check_months, clean
+from state_store import default_store
+
+
+def parse_cards(content, scope=None):
+    soup = make_tree(content, scope=scope)
+    articles = soup.find_all("article")
+    data = []
+    for i in articles:
+        title = clean(i.find("h2", {"class": "card__title"}))
+        link = i.find("a").get("href")
+        date = clean(i.find("div", {"class": "card__meta"}))
+
+        data.append(ArticleRecord(link=link, title=title, date=parse_date(date, "%B %d, %Y")))
+    return data
 
 
 class Marcum:
-    def __init__(self, headless=True):
+    def __init__(self, headless=True, scraper=None):
+        self.name = "marcum"
         self.url = "https://www.marcumllp.com/insights"
-        self.scraper = AsyncScraper(headless=headless)
-        self.posts = []
+        self.state = default_store
+        self.parse_pool = default_pool
+        self.scraper = scraper or AsyncScraper(headless=headless)
+        self.scope = "div.page-body__right.page-body__right--wide"
+        self.card_selector = "div.page-body__right.page-body__right--wide article"
 
-    async def show_more_posts(self, page, fetch: Literal["first", "6m", "12m", "all"]):
+    async def show_more_posts(self, page, fetch: Literal["first", "6m", "12m", "all", "new"], emit):
         page_num = 1
         while True:
-            await page.wait_for_selector("div.page-body__right.page-body__right--wide")
-            content = await page.content()
-            df = self.make_df(content)
-            self.posts.append(df)
+            await page.wait_for_selector(self.scope)
+            content = await self.scraper.outer_html(page, self.scope)
+            batch = await self.parse(content)
+            await emit(batch)
 
             if fetch == "first":
                 break
             elif fetch == "all":
                 pass
+            elif fetch == "new":
+                if self.state.is_known(self.name, batch):
+                    break
             elif re.match(r"\b\d{1,2}m\b", fetch):
-                if check_months(df, fetch):
+                if check_months(batch, fetch):
                     break
             else:
                 break
@@ -37,33 +59,37 @@ class Marcum:
 
             if not await page.is_visible(button_selector):
                 return
+            state = await self.scraper.waiter.snapshot(page, self.card_selector)
             await page.click(button_selector)
-            await page.wait_for_timeout(2000)
+            if await self.scraper.waiter.wait(page, self.card_selector, state) == "timeout":
+                return
+
+    async def parse(self, content):
+        return await self.parse_pool.run(parse_cards, content, self.scope)
 
     def make_df(self, content):
-        soup = BeautifulSoup(content, "html.parser")
-        articles = soup.find("div", {"id": "column column-block card-list__block ajax-item aos-init aos-animate"})
-        articles = soup.find_all("article")
-        data = []
-        for i in articles:
-            title = clean(i.find("h2", {"class": "card__title"}))
-            link = i.find("a").get("href")
-            date = clean(i.find("div", {"class": "card__meta"}))
-
-            data.append({"link": link, "title": title, "date": date})
-
-        df = pd.DataFrame(data)
-        df["date"] = pd.to_datetime(df["date"], format="%B %d, %Y")
-        return df
-
-    async def execute(self, fetch: Literal["first", "6m", "12m", "all"] = "first"):
+        return records_frame(parse_cards(content, self.scope))
+
+    async def stream(self, fetch: Literal["first", "6m", "12m", "all", "new"] = "first"):
+        """Yields a list of ArticleRecords for each batch of cards as the listing is paged through."""
+
+        def crawl(emit):
+            return self.scraper.scrape(
+                self.url,
+                custom_function=self.show_more_posts,
+                block="listing",
+                fetch=fetch,
+                emit=emit,
+            )
+
+        async with self.scraper:
+            async for batch in stream_batches(crawl):
+                yield batch
+
+    async def execute(self, fetch: Literal["first", "6m", "12m", "all", "new"] = "first"):
         print(f"---{self.url}", end="---")
-        await self.scraper.scrape(
-            self.url,
-            custom_function=self.show_more_posts,
-            fetch=fetch,
-        )
-        posts = pd.concat(self.posts)
+        posts = await collect(self.stream(fetch))
+        posts = self.state.record(self.name, posts, fetch)
         posts = posts.sort_values(by="date", ascending=False)
         print(len(posts))
         return posts
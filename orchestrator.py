@@ -0,0 +1,139 @@
+import argparse
+import asyncio
+import inspect
+import time
+
+import pandas as pd
+
+from article_store import ArticleStore
+from baker_tilly import BakerTilly
+from bdo import BDO
+from cbh import CBH
+from cla_connect import ClaConnect
+from cohn_reznick import CohnReznick
+from eisner_ramper import EisnerRamper
+from grant_thornton import GrantThornton
+from http_cache import HTTPCache
+from http_client import AsyncHTTPClient
+from marcum import Marcum
+from parquet_sink import ParquetSink
+from parse_pool import ParsePool
+from plante_moran import PlanteMoran
+from prager_metis import PragerMetis
+from pwc import PWC
+from rsm import RSM
+from scraper import AsyncScraper
+from withum import Withum
+
+SOURCES = {
+    "baker_tilly": BakerTilly,
+    "bdo": BDO,
+    "cbh": CBH,
+    "cla_connect": ClaConnect,
+    "cohn_reznick": CohnReznick,
+    "eisner_ramper": EisnerRamper,
+    "grant_thornton": GrantThornton,
+    "marcum": Marcum,
+    "plante_moran": PlanteMoran,
+    "prager_metis": PragerMetis,
+    "pwc": PWC,
+    "rsm": RSM,
+    "withum": Withum,
+}
+
+# Seconds a cached response is served without revalidation; everything else is
+# revalidated with a conditional request on every run.
+CACHE_TTL = {
+    "https://rsmus.com/insights/_jcr_content": 3600,
+}
+
+
+def build_source(name, scraper, client, **attrs):
+    # Shared resources go to the constructor when it takes them and `attrs` (parse_pool,
+    # dedupe, ...) replace the defaults of the sources that have them.
+    cls = SOURCES[name]
+    shared = {"scraper": scraper, "client": client}
+    params = inspect.signature(cls).parameters
+    source = cls(**{key: value for key, value in shared.items() if key in params})
+    for key, value in attrs.items():
+        if value is not None and hasattr(source, key):
+            setattr(source, key, value)
+    return source
+
+
+async def run_source(name, source, fetch, timeout):
+    start = time.perf_counter()
+    try:
+        posts = await asyncio.wait_for(source.execute(fetch=fetch), timeout)
+        error = None
+    except Exception as e:
+        posts, error = None, e
+    return {"source": name, "posts": posts, "error": error, "elapsed": time.perf_counter() - start}
+
+
+async def run_all(sources=None, fetch="first", page_budget=6, http_budget=16, timeout=900, headless=True, cache=None, parse_processes=0, sink=None, store=None):
+    """
+    Runs every source concurrently. All Playwright sources share one AsyncScraper whose pool
+    allows at most `page_budget` open pages, and all API sources share one AsyncHTTPClient
+    limited to `http_budget` requests in flight. Each source gets `timeout` seconds; failures
+    and timeouts are reported per source without affecting the others. An optional HTTPCache
+    is shared by both. With `parse_processes` the sources parse pages in a shared process pool
+    instead of on the event loop. With a ParquetSink as `sink` and/or an ArticleStore as
+    `store`, each source's posts are merged into them after the run.
+
+    Returns the merged posts tagged with a `source` column and a list of per-source reports.
+    """
+    names = sources or list(SOURCES)
+    scraper = AsyncScraper(headless=headless, max_concurrent=page_budget, cache=cache)
+    client = AsyncHTTPClient(max_concurrent=http_budget, cache=cache)
+    parse_pool = ParsePool(parse_processes)
+
+    async with scraper, client, parse_pool:
+        instances = {name: build_source(name, scraper, client, parse_pool=parse_pool) for name in names}
+        results = await asyncio.gather(*(run_source(name, source, fetch, timeout) for name, source in instances.items()))
+
+    frames, report = [], []
+    for result in results:
+        posts = result.pop("posts")
+        if posts is not None:
+            if sink is not None:
+                sink.write(result["source"], posts)
+            if store is not None:
+                store.upsert(posts, source=result["source"])
+            frames.append(posts.assign(source=result["source"]))
+            result["count"] = len(posts)
+        else:
+            result["count"] = 0
+        result["error"] = repr(result["error"]) if result["error"] is not None else None
+        report.append(result)
+
+    posts = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+    return posts, report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scrape every source concurrently.")
+    parser.add_argument("--fetch", default="first")
+    parser.add_argument("--sources", nargs="*", choices=list(SOURCES))
+    parser.add_argument("--page-budget", type=int, default=6)
+    parser.add_argument("--http-budget", type=int, default=16)
+    parser.add_argument("--timeout", type=float, default=900)
+    parser.add_argument("--cache", help="directory for the on-disk HTTP cache")
+    parser.add_argument("--parse-processes", type=int, default=0, help="parse pages in this many worker processes")
+    parser.add_argument("--sink", help="directory of the partitioned Parquet store to merge posts into")
+    parser.add_argument("--store", help="SQLite article database to upsert posts into")
+    args = parser.parse_args()
+
+    cache = HTTPCache(args.cache, ttl=CACHE_TTL) if args.cache else None
+    sink = ParquetSink(args.sink) if args.sink else None
+    store = ArticleStore(args.store) if args.store else None
+    posts, report = asyncio.run(run_all(args.sources, args.fetch, args.page_budget, args.http_budget, args.timeout, cache=cache, parse_processes=args.parse_processes, sink=sink, store=store))
+    for result in report:
+        status = result["error"] or "ok"
+        print(f"{result['source']:<16}{result['count']:>6}{result['elapsed']:>8.1f}s  {status}")
+    print(len(posts))
+    return posts
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+import os
+import time
+import uuid
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+PARTITIONING = ds.partitioning(pa.schema([("source", pa.string()), ("month", pa.string())]), flavor="hive")
+UNDATED = "unknown"
+
+
+class ParquetSink:
+    """
+    Stores scraped posts as Parquet under `path/source=<name>/month=<YYYY-MM>/`.
+
+    `write(source, posts)` merges on the link column by default: each touched month partition
+    is rewritten with the new rows replacing existing rows for the same link. `mode="append"`
+    adds a new file instead, which is cheaper but keeps duplicates. Columns in
+    `dictionary_columns` are stored dictionary-encoded (list columns such as `tags` as lists
+    of dictionary values). `read` prunes partitions and row groups on source and date, so
+    only the matching files are opened.
+    """
+
+    def __init__(self, path="data/posts", dictionary_columns=("category", "tags")):
+        self.path = path
+        self.dictionary_columns = dictionary_columns
+        os.makedirs(path, exist_ok=True)
+
+    def partition_path(self, source, month):
+        return os.path.join(self.path, f"source={source}", f"month={month}")
+
+    def prepare(self, posts):
+        posts = posts.reset_index(drop=True)
+        if "date" in posts.columns:
+            posts["date"] = pd.to_datetime(posts["date"], errors="coerce", utc=True).dt.tz_localize(None)
+            months = posts["date"].dt.strftime("%Y-%m").fillna(UNDATED)
+        else:
+            months = pd.Series(UNDATED, index=posts.index)
+        return posts.drop(columns=["source", "month"], errors="ignore"), months
+
+    def to_table(self, posts):
+        table = pa.Table.from_pandas(posts, preserve_index=False)
+        for name in self.dictionary_columns:
+            if name not in table.column_names:
+                continue
+            index = table.schema.get_field_index(name)
+            column = table.column(index)
+            if pa.types.is_string(column.type):
+                column = column.dictionary_encode()
+            elif pa.types.is_list(column.type) and pa.types.is_string(column.type.value_type):
+                column = column.cast(pa.list_(pa.dictionary(pa.int32(), pa.string())))
+            table = table.set_column(index, name, column)
+        return table
+
+    def files(self, directory):
+        if not os.path.isdir(directory):
+            return []
+        return sorted(os.path.join(directory, name) for name in os.listdir(directory) if name.endswith(".parquet"))
+
+    def read_files(self, files):
+        schema = pa.unify_schemas([pq.read_schema(file) for file in files])
+        return ds.dataset(files, schema=schema, format="parquet").to_table().to_pandas()
+
+    def write_file(self, directory, posts):
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"part-{time.time_ns()}-{uuid.uuid4().hex[:8]}.parquet")
+        pq.write_table(self.to_table(posts), f"{path}.tmp")
+        os.replace(f"{path}.tmp", path)
+        return path
+
+    def write(self, source, posts, mode="merge"):
+        """Writes `posts` for `source`; `mode` is "merge" (upsert on link) or "append". Returns the number of rows written."""
+        if mode not in ("merge", "append"):
+            raise ValueError(f"mode must be 'merge' or 'append', got {mode!r}")
+        if posts is None or posts.empty:
+            return 0
+
+        posts, months = self.prepare(posts)
+        for month, rows in posts.groupby(months, sort=False):
+            directory = self.partition_path(source, month)
+            previous = []
+            if mode == "merge":
+                rows = rows.drop_duplicates(subset="link", keep="last")
+                previous = self.files(directory)
+                if previous:
+                    existing = self.read_files(previous)
+                    existing = existing[~existing["link"].isin(set(rows["link"]))]
+                    rows = pd.concat([existing, rows], ignore_index=True)
+            self.write_file(directory, rows)
+            for file in previous:
+                os.remove(file)
+        return len(posts)
+
+    def dataset(self):
+        files = [os.path.join(root, name) for root, _, names in os.walk(self.path) for name in names if name.endswith(".parquet")]
+        if not files:
+            return None
+        schema = pa.unify_schemas([pq.read_schema(file) for file in files] + [PARTITIONING.schema])
+        return ds.dataset(files, schema=schema, format="parquet", partitioning=PARTITIONING, partition_base_dir=self.path)
+
+    def read(self, sources=None, start=None, end=None, columns=None):
+        """Loads posts filtered by source and by `start <= date < end`; partition and row-group statistics skip everything else."""
+        dataset = self.dataset()
+        if dataset is None:
+            return pd.DataFrame()
+
+        conditions = []
+        if sources:
+            conditions.append(ds.field("source").isin(list(sources)))
+        if start is not None:
+            start = pd.Timestamp(start)
+            conditions.append((ds.field("month") >= start.strftime("%Y-%m")) & (ds.field("month") != UNDATED))
+            conditions.append(ds.field("date") >= pa.scalar(start.to_pydatetime(), pa.timestamp("ns")))
+        if end is not None:
+            end = pd.Timestamp(end)
+            conditions.append(ds.field("month") <= end.strftime("%Y-%m"))
+            conditions.append(ds.field("date") < pa.scalar(end.to_pydatetime(), pa.timestamp("ns")))
+
+        expression = None
+        for condition in conditions:
+            expression = condition if expression is None else expression & condition
+        return dataset.to_table(columns=columns, filter=expression).to_pandas()
@@ -0,0 +1,57 @@
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+
+import parsers
+
+
+def init_worker(parser, listing):
+    # Worker processes start from a fresh import, so carry over the parser backends chosen here
+    parsers.set_parser(parser, listing)
+
+
+class ParsePool:
+    """
+    Runs the CPU-bound parse stages (listing extraction, article text, format_src) away from
+    the event loop. With `processes=0` (the default) functions run inline, exactly as before;
+    otherwise they go to a ProcessPoolExecutor and at most `max_pending` jobs are queued, so a
+    fast crawl waits for the parsers instead of piling up HTML in memory.
+
+    Functions must be module-level so they can be pickled, take raw HTML and plain arguments,
+    and return plain records (dicts, lists, strings) rather than trees or DataFrames.
+    """
+
+    def __init__(self, processes=0, max_pending=None):
+        self.processes = processes
+        self.max_pending = max_pending or 2 * max(processes, 1)
+        self.executor = None
+        self.semaphore = asyncio.Semaphore(self.max_pending)
+        self.users = 0
+
+    async def __aenter__(self):
+        self.users += 1
+        self.start()
+        return self
+
+    async def __aexit__(self, *exc):
+        self.users -= 1
+        if self.users <= 0:
+            self.users = 0
+            self.close()
+
+    def start(self):
+        if self.processes and self.executor is None:
+            self.executor = ProcessPoolExecutor(self.processes, initializer=init_worker, initargs=(parsers.PARSER, parsers.LISTING_PARSER))
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown(cancel_futures=True)
+            self.executor = None
+
+    async def run(self, func, *args):
+        if self.executor is None:
+            return func(*args)
+        async with self.semaphore:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+
+
+default_pool = ParsePool()
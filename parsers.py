@@ -0,0 +1,186 @@
+import os
+from contextlib import contextmanager
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:
+    import lxml  # noqa: F401
+
+    HAS_LXML = True
+except ImportError:
+    HAS_LXML = False
+
+try:
+    from selectolax.lexbor import LexborHTMLParser as SelectolaxParser
+
+    HAS_SELECTOLAX = True
+except ImportError:
+    try:
+        from selectolax.parser import HTMLParser as SelectolaxParser
+
+        HAS_SELECTOLAX = True
+    except ImportError:
+        HAS_SELECTOLAX = False
+
+BS4_PARSERS = {"html.parser", "lxml"}
+
+# PARSER builds BeautifulSoup trees for the article extractors, which walk individual strings.
+# LISTING_PARSER is used by the listing extractors (make_df and friends) and may also be
+# "selectolax", served through the BeautifulSoup-compatible Node wrapper below.
+PARSER = os.environ.get("SCRAPER_PARSER") or ("lxml" if HAS_LXML else "html.parser")
+LISTING_PARSER = os.environ.get("SCRAPER_LISTING_PARSER") or ("selectolax" if HAS_SELECTOLAX else PARSER)
+
+
+def available_parsers():
+    parsers = ["html.parser"]
+    if HAS_LXML:
+        parsers.append("lxml")
+    if HAS_SELECTOLAX:
+        parsers.append("selectolax")
+    return parsers
+
+
+def set_parser(parser=None, listing=None):
+    global PARSER, LISTING_PARSER
+    if parser:
+        if parser not in BS4_PARSERS:
+            raise ValueError(f"Article parser must be one of {sorted(BS4_PARSERS)}, got {parser!r}")
+        PARSER = parser
+    if listing:
+        if listing not in available_parsers():
+            raise ValueError(f"Listing parser {listing!r} is not available, choose from {available_parsers()}")
+        LISTING_PARSER = listing
+
+
+@contextmanager
+def use_parser(parser=None, listing=None):
+    previous = PARSER, LISTING_PARSER
+    set_parser(parser, listing)
+    try:
+        yield
+    finally:
+        set_parser(*previous)
+
+
+def make_soup(content, parser=None):
+    return BeautifulSoup(content, parser or PARSER)
+
+
+def strainer(scope):
+    # Turns a simple "tag#id" / "tag.class" scope into a SoupStrainer. Only the first class is
+    # used, which can keep a few extra elements but never drops the container.
+    if "#" in scope:
+        name, _, id_ = scope.partition("#")
+        return SoupStrainer(name or None, id=id_)
+    name, _, classes = scope.partition(".")
+    first = classes.split(".")[0]
+    # While the tree is built the class attribute is still the raw string, which a plain
+    # class_ value only matches when the element has no other classes
+    return SoupStrainer(name or None, class_=lambda value: value is not None and first in (value.split() if isinstance(value, str) else value))
+
+
+def make_tree(content, parser=None, scope=None):
+    """
+    Parses a listing page. With BeautifulSoup backends `scope` restricts tree building to the
+    results container; selectolax parses the whole input, which is cheaper than straining.
+    """
+    parser = parser or LISTING_PARSER
+    if parser == "selectolax":
+        return Node(SelectolaxParser(content).root)
+    if scope:
+        return BeautifulSoup(content, parser, parse_only=strainer(scope))
+    return BeautifulSoup(content, parser)
+
+
+def class_matches(value, expected):
+    # BeautifulSoup matches a multi-word class string against the whole attribute, and a
+    # single word against any of the element's classes.
+    classes = (value or "").split()
+    if len(expected.split()) > 1:
+        return classes == expected.split()
+    return expected in classes
+
+
+def selector(name, attrs):
+    # Only a prefilter: the exact check is Node.matches. Classes are narrowed on their first
+    # word, since bs4 splits the attribute on any whitespace before comparing.
+    css = name or "*"
+    for key, value in attrs.items():
+        if value is None:
+            continue
+        if key == "class":
+            css += f'[class~="{value.split()[0]}"]'
+        else:
+            css += f'[{key}="{value}"]'
+    return css
+
+
+class Node:
+    """
+    Minimal BeautifulSoup-compatible view of a selectolax node, covering what the listing
+    extractors use: find/find_all (tag name, attrs dict, class_, recursive), select, get,
+    item access, text, contents and name.
+    """
+
+    def __init__(self, node):
+        self.node = node
+
+    @property
+    def name(self):
+        return self.node.tag
+
+    @property
+    def text(self):
+        return self.node.text(deep=True)
+
+    @property
+    def contents(self):
+        return [child.text(deep=False) if child.tag == "-text" else Node(child) for child in self.node.iter(include_text=True)]
+
+    def get(self, key, default=None):
+        value = self.node.attributes.get(key)
+        return default if value is None else value
+
+    def __getitem__(self, key):
+        return self.node.attributes[key]
+
+    def matches(self, name, attrs):
+        if name and self.node.tag != name:
+            return False
+        attributes = self.node.attributes
+        for key, value in attrs.items():
+            if value is None:
+                if key in attributes:
+                    return False
+            elif key == "class":
+                if not class_matches(attributes.get("class"), value):
+                    return False
+            elif attributes.get(key) != value:
+                return False
+        return True
+
+    def iter_matches(self, name, attrs, recursive, kwargs):
+        attrs = dict(attrs or {})
+        if "class_" in kwargs:
+            attrs["class"] = kwargs.pop("class_")
+        attrs.update(kwargs)
+
+        nodes = self.node.iter() if not recursive else self.node.css(selector(name, attrs))
+        for node in nodes:
+            if node.mem_id == self.node.mem_id:
+                continue
+            node = Node(node)
+            if node.matches(name, attrs):
+                yield node
+
+    def find_all(self, name=None, attrs=None, recursive=True, **kwargs):
+        return list(self.iter_matches(name, attrs, recursive, kwargs))
+
+    def find(self, name=None, attrs=None, recursive=True, **kwargs):
+        return next(self.iter_matches(name, attrs, recursive, kwargs), None)
+
+    def select(self, css):
+        return [Node(node) for node in self.node.css(css)]
+
+    def __repr__(self):
+        return f"<Node {self.node.tag}>"
@@ -0,0 +1,128 @@
+import asyncio
+
+from fingerprints import UNCHANGED
+
+DONE = object()
+
+
+class ArticlePipeline:
+    """
+    Producer/consumer pipeline for article bodies.
+
+    Links from a listing (an iterable or an async iterable, so extraction can feed it while it
+    is still paginating) go through a bounded queue to `workers` tasks that await `fetch(link)`
+    concurrently. `stream` yields `(link, result)` as soon as each fetch finishes; failed
+    fetches are kept in `errors` instead of stopping the run. Per-domain pacing is applied by
+    the rate limiter of whichever scraper or client `fetch` uses.
+
+    With a `fingerprints` FingerprintStore, results whose text (`text(result)`, by default the
+    result itself) is unchanged since the last run are skipped and listed in `unchanged`.
+    With a `dedupe` NearDuplicateIndex, new or changed results that nearly match an article
+    seen before are skipped and listed in `duplicates` as `(link, original_link)`.
+    """
+
+    def __init__(self, fetch, workers=4, queue_size=32, dedupe=None, fingerprints=None, text=None):
+        self.fetch = fetch
+        self.workers = workers
+        self.queue_size = queue_size
+        self.dedupe = dedupe
+        self.fingerprints = fingerprints
+        self.text = text or (lambda result: result)
+        self.errors = []
+        self.unchanged = []
+        self.duplicates = []
+
+    def is_unchanged(self, link, result):
+        if self.fingerprints is None:
+            return False
+        text = self.text(result)
+        if not text or self.fingerprints.check(link, text) != UNCHANGED:
+            return False
+        self.unchanged.append(link)
+        return True
+
+    def is_duplicate(self, link, result):
+        if self.dedupe is None:
+            return False
+        text = self.text(result)
+        if not text:
+            return False
+        original = self.dedupe.check(link, text)
+        if original is not None:
+            self.duplicates.append((link, original))
+        return original is not None
+
+    async def produce(self, links, queue):
+        # The workers are still draining the queue when the links run out or fail, so the
+        # sentinels can be awaited. They are not sent on cancellation: `stream` is then
+        # cancelling the workers too, and a put on a full queue would never return.
+        try:
+            if hasattr(links, "__aiter__"):
+                async for link in links:
+                    await queue.put(link)
+            else:
+                for link in links:
+                    await queue.put(link)
+        except Exception:
+            await self.finish(queue)
+            raise
+        await self.finish(queue)
+
+    async def finish(self, queue):
+        for _ in range(self.workers):
+            await queue.put(DONE)
+
+    async def work(self, queue, results):
+        while (link := await queue.get()) is not DONE:
+            try:
+                await results.put((link, await self.fetch(link)))
+            except Exception as e:
+                self.errors.append((link, e))
+        await results.put(DONE)
+
+    async def stream(self, links):
+        queue = asyncio.Queue(self.queue_size)
+        results = asyncio.Queue(self.queue_size)
+        producer = asyncio.create_task(self.produce(links, queue))
+        workers = [asyncio.create_task(self.work(queue, results)) for _ in range(self.workers)]
+
+        try:
+            finished = 0
+            while finished < self.workers:
+                item = await results.get()
+                if item is DONE:
+                    finished += 1
+                elif not self.is_unchanged(*item) and not self.is_duplicate(*item):
+                    yield item
+            await producer
+        finally:
+            for task in [producer, *workers]:
+                task.cancel()
+            await asyncio.gather(producer, *workers, return_exceptions=True)
+
+
+async def stream_batches(produce, queue_size=8):
+    """
+    Runs `produce(emit)` and yields each batch it hands to `await emit(batch)` while it keeps
+    running, e.g. DataFrames from a Playwright page callback. The bounded queue makes a fast
+    producer wait for the consumer. An exception from `produce` is raised after the batches
+    emitted before it; closing the iterator early cancels the producer.
+    """
+    queue = asyncio.Queue(queue_size)
+
+    async def run():
+        try:
+            await produce(queue.put)
+        except Exception:
+            await queue.put(DONE)
+            raise
+        await queue.put(DONE)
+
+    task = asyncio.create_task(run())
+    try:
+        while (batch := await queue.get()) is not DONE:
+            yield batch
+        await task
+    finally:
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
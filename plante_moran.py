@@ -1,33 +1,67 @@
-import asyncio
 import re
 from typing import Literal
 
-import pandas as pd
-from bs4 import BeautifulSoup
-
+from parse_pool import default_pool
+from parsers import make_tree
+from pipeline import stream_batches
+from records import ArticleRecord, collect, parse_date, records_frame
 from scraper import AsyncScraper
-from scraper_utils import check_months, clean
+from scraper_utils import CardTracker, check_months, clean
+from state_store import default_store
+
+
+MONTHS = ["January", "February", "March", "April", "May", "June", "July", "August", "September", "October", "November", "December"]
+
+
+def parse_cards(content):
+    soup = make_tree(content)
+    articles = soup.find_all("li", {"class": "thought-item ng-scope"})
+    data = []
+    for i in articles:
+        i = i.find("div", {"class": "thought-item-details"})
+        title = clean(i.find("a"))
+        link = i.find("a").get("href")
+        date = clean(i.find("span", {"class": "item date ng-binding"})).replace(".", "")
+        for month in MONTHS:
+            if month in date:
+                date = date.replace(month, month[:3])
+                break
+        desc = clean(i.find("div", {"class": "brief ng-binding ng-scope"}))
+        category = clean(i.find("span", {"class": "item type ng-binding ng-scope"}))
+
+        data.append(ArticleRecord(link=link, title=title, date=parse_date(date, "%b %d, %Y"), desc=desc, category=category))
+    return data
 
 
 class PlanteMoran:
-    def __init__(self, headless=True):
+    def __init__(self, headless=True, scraper=None):
+        self.name = "plante_moran"
         self.url = "https://www.plantemoran.com/explore-our-thinking/search?skip=0&keyword="
-        self.scraper = AsyncScraper(headless=headless)
-        self.posts = None
-        self.months = ["January", "February", "March", "April", "May", "June", "July", "August", "September", "October", "November", "December"]
+        self.state = default_store
+        self.parse_pool = default_pool
+        self.scraper = scraper or AsyncScraper(headless=headless)
+        self.card_selector = "ul.thought-items > li.thought-item"
+        self.months = MONTHS
 
-    async def show_more_posts(self, page, fetch):
+    async def show_more_posts(self, page, fetch, emit):
+        tracker = CardTracker(self.card_selector)
         while True:
             await page.wait_for_selector("div.section.thought-list.fade-ng-cloak")
-            content = await page.content()
-            self.posts = self.make_df(content)
+            batch = None
+            content = await tracker.new_cards(page)
+            if content:
+                batch = tracker.fresh(await self.parse(content))
+                await emit(batch)
 
             if fetch == "first":
                 break
             elif fetch == "all":
                 pass
+            elif fetch == "new":
+                if batch is not None and self.state.is_known(self.name, batch):
+                    break
             elif re.match(r"\b\d{1,2}m\b", fetch):
-                if check_months(self.posts, fetch):
+                if batch is not None and check_months(batch, fetch):
                     break
             else:
                 break
@@ -36,42 +70,37 @@ class PlanteMoran:
 
             if not await page.is_visible(button_selector):
                 return
+            state = await self.scraper.waiter.snapshot(page, self.card_selector)
             await page.click(button_selector)
-            await page.wait_for_timeout(2000)
+            if await self.scraper.waiter.wait(page, self.card_selector, state) == "timeout":
+                return
 
-            await asyncio.sleep(2)
-            await page.wait_for_timeout(2000)
+    async def parse(self, content):
+        return await self.parse_pool.run(parse_cards, content)
 
     def make_df(self, content):
-        soup = BeautifulSoup(content, "html.parser")
-        articles = soup.find("ul", {"class": "thought-items"})
-        articles = articles.find_all("li", {"class": "thought-item ng-scope"})
-        data = []
-        for i in articles:
-            i = i.find("div", {"class": "thought-item-details"})
-            title = clean(i.find("a"))
-            link = i.find("a").get("href")
-            date = clean(i.find("span", {"class": "item date ng-binding"})).replace(".", "")
-            for month in self.months:
-                if month in date:
-                    date = date.replace(month, month[:3])
-                    break
-            desc = clean(i.find("div", {"class": "brief ng-binding ng-scope"}))
-            category = clean(i.find("span", {"class": "item type ng-binding ng-scope"}))
+        return records_frame(parse_cards(content))
+
+    async def stream(self, fetch: Literal["first", "3m", "6m", "12m", "all", "new"] = "first"):
+        """Yields a list of ArticleRecords for each batch of cards as the listing is paged through."""
 
-            data.append({"link": link, "title": title, "date": date, "desc": desc, "category": category})
+        def crawl(emit):
+            return self.scraper.scrape(
+                self.url,
+                custom_function=self.show_more_posts,
+                block="listing",
+                fetch=fetch,
+                emit=emit,
+            )
 
-        df = pd.DataFrame(data)
-        df["date"] = pd.to_datetime(df["date"], format="%b %d, %Y", errors="coerce")
-        return df
+        async with self.scraper:
+            async for batch in stream_batches(crawl):
+                yield batch
 
-    async def execute(self, fetch: Literal["first", "3m", "6m", "12m", "all"] = "first"):
+    async def execute(self, fetch: Literal["first", "3m", "6m", "12m", "all", "new"] = "first"):
         print(f"---{self.url}", end="---")
-        await self.scraper.scrape(
-            self.url,
-            custom_function=self.show_more_posts,
-            fetch=fetch,
-        )
-        self.posts.sort_values(by="date", ascending=False, inplace=True)
-        print(len(self.posts))
-        return self.posts
+        posts = await collect(self.stream(fetch))
+        posts = self.state.record(self.name, posts, fetch)
+        posts = posts.sort_values(by="date", ascending=False)
+        print(len(posts))
+        return posts
@@ -1,17 +1,59 @@
+import asyncio
 import re
 from typing import Literal
 
-import pandas as pd
-import requests
-from bs4 import BeautifulSoup
-
+from date_filter import SolrDateFilter, window_start
+from http_client import AsyncHTTPClient
+from parse_pool import default_pool
+from parsers import make_soup, make_tree
+from pipeline import ArticlePipeline, stream_batches
+from records import ArticleRecord, collect, parse_date
 from scraper import AsyncScraper
 from scraper_utils import check_months, clean
+from state_store import default_store
+
+
+PDF_TEXT = "A PDF version of the full publication is attached here:"
+
+
+def parse_table(content):
+    soup = make_tree(content)
+    a = soup.select("div.condensed-cards div.columns")
+    d = []
+    for article in a:
+        title = clean(article.find("div", {"class": "module-heading"}))
+        date = clean(article.find("div", {"class": "date"}))
+        ref = clean(article.find("div", {"class": "pwc-col"}))
+        link = article.find("a")
+        link = link.get("href") if link else None
+
+        d.append({"title": title, "date": date, "ref": ref, "link": link})
+    return d
+
+
+def parse_article(content):
+    soup = make_soup(content)
+    div = soup.find("div", {"class": "topic doc-body-content"})
+    if not div:
+        return None
+    textdivs = div.find_all("div")
+    return "\n".join([clean(i) for i in textdivs if PDF_TEXT not in i.text])
 
 
 class PWC:
-    def __init__(self):
-        self.scraper = AsyncScraper(headless=False)
+    def __init__(self, scraper=None, client=None):
+        self.name = "pwc"
+        self.scraper = scraper or AsyncScraper(headless=False)
+        self.rows = 100
+        self.concurrency = 6
+        self.state = default_store
+        self.date_filter = SolrDateFilter("pwcSortDate_dt")
+        self.parse_pool = default_pool
+        # Optional NearDuplicateIndex used to skip articles repeated across the feeds
+        self.dedupe = None
+        # Optional FingerprintStore; unchanged article bodies are not re-emitted
+        self.fingerprints = None
+        self.client = client or AsyncHTTPClient(max_concurrent=self.concurrency, limit_per_host=self.concurrency)
         self.urls = [
             "https://viewpoint.pwc.com/bin/pwc-madison/vp-search?locale=en_us&start={}&q=In%20brief&sp_k=us&rows={}&sort=pwcSortDate_dt%20desc&fq=pwcContentType_s%3A(%22In%20brief%22)&pwcSearchType=curated&_cookie=false",
             "https://viewpoint.pwc.com/bin/pwc-madison/vp-search?locale=en_us&start={}&rows={}&q=In%20depth&disp=Indepth&sp_k=us&pwcSearchType=main&_cookie=false",
@@ -22,71 +64,107 @@ class PWC:
         ]
 
     async def get_pwc_table(self, content):
-        soup = BeautifulSoup(content, "html.parser")
-        a = soup.select("div.condensed-cards div.columns")
-        d = []
-        for article in a:
-            title = clean(article.find("div", {"class": "module-heading"}))
-            date = clean(article.find("div", {"class": "date"}))
-            ref = clean(article.find("div", {"class": "pwc-col"}))
-            link = article.find("a")
-            link = link.get("href") if link else None
-
-            d.append({"title": title, "date": date, "ref": ref, "link": link})
-        return d
-
-    def get_posts(self, url, fetch):
-        start, rows = 0, 20
-        posts, count = [], 0
-        while True:
-            response = requests.get(url.format(start, rows))
-            if response.status_code != 200:
-                return None
-            response = response.json()["response"]
-            df = self.make_df(response)
-            posts.append(df)
-            count += len(df)
-
-            if fetch == "first":
-                break
-            elif fetch == "all":
-                if count >= response["numFound"]:
-                    break
-            elif re.match(r"\b\d{1,2}m\b", fetch):
-                if check_months(df, fetch):
-                    break
-            else:
+        return await self.parse_pool.run(parse_table, content)
+
+    async def get_page(self, url, start):
+        response = await self.client.get(url.format(start, self.rows))
+        if response.status != 200:
+            return None
+        return response.json()["response"]
+
+    async def get_posts(self, url, fetch, emit):
+        since = window_start(fetch)
+        if since is not None:
+            url += self.date_filter.query(since)
+        first = await self.get_page(url, 0)
+        if first is None or not first["docs"]:
+            return
+        batch = self.make_records(first)
+        await emit(self.date_filter.apply(batch, since))
+
+        # With the window pushed down to Solr, numFound only counts matching items, so every
+        # remaining page is wanted, as with "all".
+        exhaustive = fetch == "all" or (since is not None and self.date_filter.pushdown)
+        if fetch == "first":
+            return
+        elif exhaustive:
+            wave = first["numFound"]
+        elif fetch == "new" or re.match(r"\b\d{1,2}m\b", fetch):
+            if self.past_window(batch, fetch):
+                return
+            wave = self.concurrency
+        else:
+            return
+
+        # numFound gives every remaining offset up front. Exhaustive fetches take them at once
+        # (bounded by the client); client-side month windows and incremental runs go wave by
+        # wave and stop once a page passes the cutoff.
+        offsets = list(range(self.rows, first["numFound"], self.rows))
+        for i in range(0, len(offsets), wave):
+            pages = await asyncio.gather(*(self.get_page(url, start) for start in offsets[i : i + wave]))
+            batches = [self.make_records(page) for page in pages if page and page["docs"]]
+            for batch in batches:
+                await emit(self.date_filter.apply(batch, since))
+            if not exhaustive and any(self.past_window(batch, fetch) for batch in batches):
                 break
 
-            start += rows
-        return posts
+    def past_window(self, batch, fetch):
+        if fetch == "new":
+            return self.state.is_known(self.name, batch)
+        return check_months(batch, fetch)
 
-    def make_df(self, response):
-        data = response["docs"]
-        df = pd.DataFrame(data)[["pwcContentId", "pwcContentType", "pwcReleaseDate", "description", "title", "url"]]
-        df = df.rename(columns={"pwcReleaseDate": "date"})
-        df["date"] = pd.to_datetime(df["date"], format="%d %b %Y")
-        return df
+    def make_records(self, response):
+        return [
+            ArticleRecord(
+                link=doc["url"],
+                title=doc["title"],
+                date=parse_date(doc["pwcReleaseDate"], "%d %b %Y"),
+                extra={"pwcContentId": doc["pwcContentId"], "pwcContentType": doc["pwcContentType"], "description": doc["description"]},
+            )
+            for doc in response["docs"]
+        ]
 
     async def scrape_article(self, url):
-        pdftext = "A PDF version of the full publication is attached here:"
         content = await self.scraper.scrape(url)
-        soup = BeautifulSoup(content, "html.parser")
-        div = soup.find("div", {"class": "topic doc-body-content"})
-        if not div:
-            return None
-        textdivs = div.find_all("div")
-        text = "\n".join([clean(i) for i in textdivs if pdftext not in i.text])
-        return text
+        return await self.parse_pool.run(parse_article, content)
+
+    async def scrape_articles(self, urls, workers=None):
+        pipeline = ArticlePipeline(self.scrape_article, workers or self.scraper.max_concurrent, dedupe=self.dedupe, fingerprints=self.fingerprints)
+        # One use of the scraper for the whole run keeps the pool up between fetches
+        async with self.scraper:
+            async for url, text in pipeline.stream(urls):
+                yield url, text
 
-    async def execute(self, url=None, fetch: Literal["first", "6m", "12m", "all"] = "first"):
+    async def stream(self, url=None, fetch: Literal["first", "6m", "12m", "all", "new"] = "first"):
+        """Yields a list of ArticleRecords per results page as the feeds are fetched concurrently, without items already yielded by another feed."""
         urls = [url] if url else self.urls
-        posts = []
         for url in urls:
             print(f"---{url}", end="---")
-            posts.extend(self.get_posts(url, fetch))
 
-        posts = pd.concat(posts)
+        async def crawl(emit):
+            # A failing feed cancels the others rather than leaving them blocked on the queue
+            tasks = [asyncio.create_task(self.get_posts(url, fetch, emit)) for url in urls]
+            try:
+                await asyncio.gather(*tasks)
+            finally:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+
+        seen = set()
+        async with self.client:
+            async for batch in stream_batches(crawl):
+                fresh = []
+                for record in batch:
+                    if record.extra["pwcContentId"] not in seen:
+                        seen.add(record.extra["pwcContentId"])
+                        fresh.append(record)
+                if fresh:
+                    yield fresh
+
+    async def execute(self, url=None, fetch: Literal["first", "6m", "12m", "all", "new"] = "first"):
+        posts = await collect(self.stream(url, fetch))
+        posts = self.state.record(self.name, posts, fetch)
         posts = posts.sort_values(by="date", ascending=False)
         print(len(posts))
         return posts
@@ -0,0 +1,99 @@
+import asyncio
+import time
+from urllib.parse import urlparse
+
+
+class TokenBucket:
+    """
+    Token bucket that lets callers reserve a token and sleep for the resulting delay, so
+    concurrent callers queue up in order without holding a lock.
+    """
+
+    def __init__(self, rate, burst):
+        self.base_rate = rate
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self):
+        self.refill()
+        self.tokens -= 1
+        return 0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    async def acquire(self):
+        delay = self.reserve()
+        if delay:
+            await asyncio.sleep(delay)
+
+    def penalize(self, retry_after=None, min_rate=0.05):
+        self.refill()
+        self.rate = max(min_rate, self.rate / 2)
+        if retry_after:
+            self.tokens = min(self.tokens, -retry_after * self.rate)
+
+    def reward(self):
+        self.rate = min(self.base_rate, self.rate * 1.1)
+
+
+def parse_retry_after(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class DomainRateLimiter:
+    """
+    One token bucket per domain, so politeness delays for one firm never hold back another.
+    `limits` maps a domain (matching itself and its subdomains) to `(rate, burst)`; other
+    domains get the default. With `adaptive`, a 429/503 halves the domain's rate and honours
+    Retry-After, and each success lets the rate recover towards its configured value.
+    """
+
+    def __init__(self, rate=2.0, burst=4, limits=None, adaptive=True):
+        self.rate = rate
+        self.burst = burst
+        self.limits = limits or {}
+        self.adaptive = adaptive
+        self.buckets = {}
+
+    def domain(self, url):
+        host = urlparse(url).hostname or ""
+        return host.removeprefix("www.")
+
+    def bucket(self, url):
+        domain = self.domain(url)
+        bucket = self.buckets.get(domain)
+        if bucket is None:
+            rate, burst = self.rate, self.burst
+            for suffix, limit in self.limits.items():
+                if domain == suffix or domain.endswith("." + suffix):
+                    rate, burst = limit
+                    break
+            bucket = self.buckets[domain] = TokenBucket(rate, burst)
+        return bucket
+
+    async def acquire(self, url):
+        await self.bucket(url).acquire()
+
+    def feedback(self, url, status, retry_after=None):
+        if not self.adaptive:
+            return
+        if status in (429, 503):
+            self.bucket(url).penalize(parse_retry_after(retry_after))
+        elif status < 400:
+            self.bucket(url).reward()
+
+
+DEFAULT_LIMITS = {
+    "claconnect.com": (0.2, 1),
+    "viewpoint.pwc.com": (8.0, 8),
+}
+
+default_limiter = DomainRateLimiter(limits=DEFAULT_LIMITS)
@@ -0,0 +1,119 @@
+import functools
+from datetime import datetime
+
+import pandas as pd
+
+FIELDS = ("link", "title", "date", "desc", "category", "tags")
+# Always present in the DataFrame; the other fields only when some record has them
+REQUIRED = ("link", "title", "date")
+
+
+@functools.lru_cache(maxsize=4096)
+def parse_date(text, format=None):
+    """Parses a listing date with `format` (or pandas' inference), returning None when it does not parse. Listings repeat dates a lot, hence the cache."""
+    if not text:
+        return None
+    try:
+        if format:
+            return datetime.strptime(text, format)
+        value = pd.to_datetime(text)
+    except (ValueError, TypeError, OverflowError):
+        return None
+    return None if pd.isna(value) else value.to_pydatetime()
+
+
+class ArticleRecord:
+    """
+    One listing item. Slotted, so a deep crawl holds a few small objects per article instead
+    of a dict or a DataFrame row per page; source-specific fields go in the `extra` dict.
+    `get` and item access also accept "url" for the link, so records work where dicts did.
+    """
+
+    __slots__ = FIELDS + ("extra",)
+
+    def __init__(self, link=None, title=None, date=None, desc=None, category=None, tags=None, extra=None):
+        self.link = link
+        self.title = title
+        self.date = date
+        self.desc = desc
+        self.category = category
+        self.tags = tags
+        self.extra = extra or None
+
+    def get(self, key, default=None):
+        if key == "url":
+            key = "link"
+        if key in FIELDS:
+            value = getattr(self, key)
+        else:
+            value = self.extra.get(key) if self.extra else None
+        return default if value is None else value
+
+    def __getitem__(self, key):
+        value = self.get(key)
+        if value is None and key not in FIELDS and key != "url":
+            raise KeyError(key)
+        return value
+
+    def as_dict(self):
+        data = {name: getattr(self, name) for name in FIELDS}
+        data.update(self.extra or {})
+        return data
+
+    def __repr__(self):
+        return f"<ArticleRecord {self.link}>"
+
+
+class RecordBuffer:
+    """
+    Append-only columnar buffer of ArticleRecords: each field is one list, extra fields are
+    padded with None, and `to_df` builds a single DataFrame at the end of a crawl. Every
+    source's frame has its links in the same `link` column, so merged runs line up.
+    """
+
+    def __init__(self):
+        self.columns = {name: [] for name in FIELDS}
+        self.extra = {}
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def append(self, record):
+        for name, column in self.columns.items():
+            column.append(getattr(record, name))
+        for key, value in (record.extra or {}).items():
+            if key not in self.extra:
+                self.extra[key] = [None] * self.size
+            self.extra[key].append(value)
+        self.size += 1
+        for column in self.extra.values():
+            if len(column) < self.size:
+                column.append(None)
+
+    def extend(self, records):
+        for record in records:
+            self.append(record)
+        return self
+
+    def to_df(self):
+        data = {}
+        for name, column in self.columns.items():
+            if name in REQUIRED or any(value is not None for value in column):
+                data[name] = column
+        data.update(self.extra)
+        df = pd.DataFrame(data)
+        df["date"] = pd.to_datetime(df["date"])
+        return df
+
+
+def records_frame(records):
+    return RecordBuffer().extend(records).to_df()
+
+
+async def collect(batches):
+    """Drains an async iterator of record batches (a source's `stream`) into one DataFrame."""
+    buffer = RecordBuffer()
+    async for batch in batches:
+        buffer.extend(batch)
+    return buffer.to_df()
@@ -1,42 +1,60 @@
 import re
-from datetime import datetime, timedelta
 from typing import Literal
 
-import pandas as pd
-import requests
+from date_filter import DateFilter, window_start
+from http_client import AsyncHTTPClient
+from records import ArticleRecord, collect, parse_date
+from state_store import default_store
 
 
 class RSM:
-    def __init__(self):
+    def __init__(self, client=None):
+        self.name = "rsm"
         self.url = "https://rsmus.com/insights/_jcr_content/root/container/container/container_copy/cardlist.list.json"
+        self.state = default_store
+        # The endpoint returns the whole list; month windows are cut client-side
+        self.date_filter = DateFilter()
+        self.client = client or AsyncHTTPClient()
 
-    def get_posts(self, fetch):
-        r = requests.get(self.url)
-        if r.status_code != 200:
+    async def get_posts(self, fetch):
+        r = await self.client.get(self.url)
+        if r.status != 200:
             return None
-        df = pd.DataFrame(r.json()["originalResultsList"])
-        df["url"] = "https://rsmus.com" + df["callToActionLink"].apply(lambda x: x["url"])
-        df["tags"] = df["displayableTags"].apply(lambda x: [i["title"] for i in x])
-        df = df[["title", "formattedDate", "description", "url", "tags"]]
-        df = df.rename(columns={"formattedDate": "date"})
-
-        if fetch == "all":
-            return df
+        posts = self.make_records(r.json())
+
+        if fetch == "all" or fetch == "new":
+            return posts
         elif re.match(r"\b\d{1,2}m\b", fetch):
-            df = df.dropna(subset=["date"])
-            months = int(fetch[:-1])
-            threshold_date = datetime.now() - timedelta(days=months * 30)
-            df["date"] = pd.to_datetime(df["date"], errors="coerce")
-            df = df[df["date"] >= threshold_date]
-            return df
+            since = window_start(fetch)
+            return self.date_filter.apply([post for post in posts if post.date is not None], since)
         else:
             return None
 
-    def execute(self, fetch):
-        print(f"---{self.url}", end="---")
+    def make_records(self, data):
+        return [
+            ArticleRecord(
+                link="https://rsmus.com" + item["callToActionLink"]["url"],
+                title=item["title"],
+                date=parse_date(item.get("formattedDate")),
+                tags=[tag["title"] for tag in item["displayableTags"]],
+                extra={"description": item.get("description")},
+            )
+            for item in data["originalResultsList"]
+        ]
+
+    async def stream(self, fetch: Literal["first", "6m", "12m", "all", "new"] = "first"):
+        """Yields the single batch of ArticleRecords the listing endpoint returns."""
         if fetch == "first":
-            fetch == "all"
-        posts = self.get_posts(fetch)
+            fetch = "all"
+        async with self.client:
+            posts = await self.get_posts(fetch)
+        if posts is not None:
+            yield posts
+
+    async def execute(self, fetch: Literal["first", "6m", "12m", "all", "new"] = "first"):
+        print(f"---{self.url}", end="---")
+        posts = await collect(self.stream(fetch))
+        posts = self.state.record(self.name, posts, fetch)
         posts = posts.sort_values(by="date", ascending=False)
         print(len(posts))
         return posts
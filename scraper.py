@@ -1,12 +1,19 @@
 import asyncio
 import json
 import os
-import random
 from asyncio import Semaphore
+from collections import deque
+from contextlib import asynccontextmanager
 
-from bs4 import BeautifulSoup
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
 from playwright.async_api import async_playwright
 
+from blocking import get_blocker
+from fingerprints import fingerprint
+from parse_pool import default_pool
+from parsers import make_soup
+from rate_limit import default_limiter
+
 
 def create_args(headless=True, text_only=True):
     args = [
@@ -56,6 +63,78 @@ def create_args(headless=True, text_only=True):
     return args
 
 
+SETTLE_OBSERVER = """
+() => {
+    if (!window.__scrollSettle) {
+        window.__scrollSettle = { last: performance.now() };
+        new MutationObserver(() => { window.__scrollSettle.last = performance.now(); })
+            .observe(document.documentElement, { childList: true, subtree: true });
+    }
+}
+"""
+
+SETTLE_SIGNALS = """
+(selector) => [
+    document.body ? document.body.scrollHeight : 0,
+    selector ? document.querySelectorAll(selector).length : 0,
+    window.scrollY + window.innerHeight,
+]
+"""
+
+
+RESULTS_SNAPSHOT = """
+(selector) => {
+    const els = document.querySelectorAll(selector);
+    return [els.length, els.length ? els[0].textContent : null];
+}
+"""
+
+RESULTS_CHANGED = """
+([selector, count, first]) => {
+    const els = document.querySelectorAll(selector);
+    return els.length > count || (els.length > 0 && els[0].textContent !== first);
+}
+"""
+
+
+class ResultWaiter:
+    """
+    Replaces fixed sleeps after a pagination click. `snapshot` records the number of result
+    cards and the text of the first one; `wait` resolves as soon as more cards appear, the first
+    card changes (page replaced), a response whose URL contains `response` completes, or
+    `timeout` seconds pass. Every wait is recorded in `timings`.
+    """
+
+    def __init__(self, timeout=10):
+        self.timeout = timeout
+        self.timings = []
+
+    async def snapshot(self, page, selector):
+        return await page.evaluate(RESULTS_SNAPSHOT, selector)
+
+    async def wait(self, page, selector, snapshot, response=None, timeout=None):
+        timeout = (timeout or self.timeout) * 1000
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+
+        waits = {asyncio.ensure_future(page.wait_for_function(RESULTS_CHANGED, arg=[selector, *snapshot], timeout=timeout, polling=100)): "results"}
+        if response:
+            waits[asyncio.ensure_future(page.wait_for_response(lambda r: response in r.url, timeout=timeout))] = "response"
+
+        reason, pending = "timeout", set(waits)
+        while pending and reason == "timeout":
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if not task.exception():
+                    reason = waits[task]
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+        self.timings.append({"url": page.url, "selector": selector, "reason": reason, "elapsed": loop.time() - start})
+        return reason
+
+
 class Scroller:
     def __init__(self, scroll_config=None):
         if not scroll_config:
@@ -90,6 +169,168 @@ class Scroller:
         await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
         await asyncio.sleep(scroll_pause)
 
+    async def wait_quiet(self, page, since, quiet_ms, timeout):
+        try:
+            await page.wait_for_function(
+                "([since, quiet]) => performance.now() - Math.max(window.__scrollSettle.last, since) >= quiet",
+                arg=[since, quiet_ms],
+                timeout=timeout * 1000,
+                polling=100,
+            )
+        except PlaywrightTimeoutError:
+            pass
+
+    async def settle_scroll(self, page, selector=None):
+        """
+        Scrolls one viewport at a time until the page stops growing. After each step it waits for
+        a quiet period with no DOM insertions (bounded by `settle_timeout`), then compares the
+        scroll height and the number of `selector` matches with the previous step. Stops at the
+        bottom once neither grows, or after `max_steps` steps / `max_time` seconds.
+        """
+        max_steps = self.scroll_config.get("max_steps", 50)
+        max_time = self.scroll_config.get("max_time", 30)
+        quiet_ms = self.scroll_config.get("quiet_ms", 500)
+        settle_timeout = self.scroll_config.get("settle_timeout", 3)
+        selector = selector or self.scroll_config.get("selector")
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + max_time
+        await page.evaluate(SETTLE_OBSERVER)
+
+        previous = None
+        for _ in range(max_steps):
+            since = await page.evaluate("() => { window.scrollBy(0, window.innerHeight); return performance.now(); }")
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            await self.wait_quiet(page, since, quiet_ms, min(settle_timeout, remaining))
+
+            height, count, bottom = await page.evaluate(SETTLE_SIGNALS, selector)
+            if (height, count) == previous and bottom >= height - 1:
+                break
+            previous = (height, count)
+
+        await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
+
+
+# Block stats are kept for the most recent pages only, so a long shared-scraper run stays bounded
+BLOCK_STATS_SIZE = 500
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/96.0.4664.110 Safari/537.36 Edg/122.0.2365.92"
+
+
+class PooledBrowser:
+    def __init__(self, browser, text_only):
+        self.browser = browser
+        self.text_only = text_only
+        self.pages = 0
+        self.active = 0
+        self.peak_memory = 0
+        self.retired = False
+
+
+class BrowserPool:
+    """
+    Keeps one Chromium per launch configuration alive and hands out fresh contexts.
+    A browser is retired after `max_pages` pages or once a page reports a JS heap
+    above `max_memory_mb`; it is closed as soon as its last page is released.
+    """
+
+    def __init__(self, headless=True, max_concurrent=3, max_pages=200, max_memory_mb=512):
+        self.headless = headless
+        self.max_pages = max_pages
+        self.max_memory = max_memory_mb * 1024 * 1024
+        self.semaphore = Semaphore(max_concurrent)
+        self.playwright = None
+        self.browsers = {}
+        self.launches = 0
+        self.lock = asyncio.Lock()
+
+    @property
+    def running(self):
+        return self.playwright is not None
+
+    async def start(self):
+        async with self.lock:
+            await self._start()
+        return self
+
+    async def close(self):
+        async with self.lock:
+            await self._close()
+
+    async def _start(self):
+        if self.playwright is None:
+            self.playwright = await async_playwright().start()
+
+    async def _close(self):
+        browsers, self.browsers = list(self.browsers.values()), {}
+        for pooled in browsers:
+            await self._close_browser(pooled)
+        if self.playwright is not None:
+            await self.playwright.stop()
+            self.playwright = None
+
+    async def _close_browser(self, pooled):
+        try:
+            await pooled.browser.close()
+        except Exception:
+            pass
+
+    async def get_browser(self, text_only):
+        async with self.lock:
+            await self._start()
+            pooled = self.browsers.get(text_only)
+            if pooled is None or pooled.retired or not pooled.browser.is_connected():
+                browser = await self.playwright.chromium.launch(**create_args(self.headless, text_only))
+                pooled = PooledBrowser(browser, text_only)
+                self.browsers[text_only] = pooled
+                self.launches += 1
+            return pooled
+
+    async def memory_usage(self, page):
+        try:
+            return await page.evaluate("performance.memory ? performance.memory.usedJSHeapSize : 0")
+        except Exception:
+            return 0
+
+    async def release(self, pooled, memory=0):
+        pooled.peak_memory = max(pooled.peak_memory, memory)
+        pooled.active -= 1
+        if pooled.pages >= self.max_pages or pooled.peak_memory >= self.max_memory:
+            pooled.retired = True
+            if self.browsers.get(pooled.text_only) is pooled:
+                del self.browsers[pooled.text_only]
+
+        if pooled.retired and pooled.active == 0:
+            await self._close_browser(pooled)
+
+    @asynccontextmanager
+    async def page(self, text_only=False, cookies=None, **context_args):
+        async with self.semaphore:
+            pooled = await self.get_browser(text_only)
+            pooled.active += 1
+            pooled.pages += 1
+            context, page = None, None
+            try:
+                context = await pooled.browser.new_context(
+                    user_agent=USER_AGENT,
+                    java_script_enabled=False if text_only else True,
+                    **context_args,
+                )
+                if cookies:
+                    await context.add_cookies(cookies)
+                page = await context.new_page()
+                yield page
+            finally:
+                # The page and its context are closed before release may retire the browser
+                memory = await self.memory_usage(page) if page is not None else 0
+                try:
+                    if context is not None:
+                        await context.close()
+                finally:
+                    await self.release(pooled, memory)
+
 
 class AsyncScraper:
     def __init__(
@@ -97,11 +338,45 @@ class AsyncScraper:
         headless=True,
         scroll_config=None,
         max_concurrent=3,
+        max_pages_per_browser=200,
+        max_memory_mb=512,
+        block_profile="default",
+        rate_limiter=None,
+        cache=None,
     ):
         self.max_concurrent = max_concurrent
-        self.semaphore = Semaphore(max_concurrent)
+        self.pool = BrowserPool(headless, max_concurrent, max_pages_per_browser, max_memory_mb)
+        self.semaphore = self.pool.semaphore
         self.scroller = Scroller(scroll_config)
+        self.waiter = ResultWaiter()
         self.headless = headless
+        self.block_profile = block_profile
+        self.block_stats = deque(maxlen=BLOCK_STATS_SIZE)
+        self.rate_limiter = rate_limiter or default_limiter
+        self.cache = cache
+        self.users = 0
+        # Counting users and starting or closing the pool is one step, so concurrent entries
+        # share one driver and an entry during the last exit waits for a fresh one.
+        self.lock = asyncio.Lock()
+
+    async def __aenter__(self):
+        async with self.lock:
+            self.users += 1
+            await self.pool.start()
+        return self
+
+    async def __aexit__(self, *exc):
+        async with self.lock:
+            self.users -= 1
+            if self.users <= 0:
+                self.users = 0
+                await self.close()
+
+    async def close(self):
+        await self.pool.close()
+
+    def block_report(self):
+        return [stats.as_dict() for stats in self.block_stats]
 
     def load_cookies(self):
         with open("cookies.json", "r") as file:
@@ -147,39 +422,45 @@ class AsyncScraper:
         text_only=False,
         cookies=False,
         custom_function=None,
+        block=None,
+        scope=None,
         **custom_function_args,
     ):
-        args = create_args(self.headless, text_only)
-
-        async with self.semaphore:
-            await asyncio.sleep(random.uniform(1, 2))
-            async with async_playwright() as p:
-                browser = await p.chromium.launch(**args)
-                context = await browser.new_context(
-                    user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/96.0.4664.110 Safari/537.36 Edg/122.0.2365.92",
-                    java_script_enabled=False if text_only else True,
-                )
-
-                if cookies:
-                    cookies = self.load_cookies()
-                    await context.add_cookies(cookies)
-
-                page = await context.new_page()
-
-                await page.goto(url)
-                await page.wait_for_selector("body")
-
-                if custom_function:
-                    if asyncio.iscoroutinefunction(custom_function):
-                        await custom_function(page, **custom_function_args)
-                    else:
-                        custom_function(page, **custom_function_args)
+        cookies = self.load_cookies() if cookies else None
+        blocker = get_blocker(block or self.block_profile)
+
+        # Holding a use of the scraper for the call means a scrape outside `async with` shuts
+        # the pool down again when it returns, instead of leaving Chromium running.
+        async with self, self.pool.page(text_only, cookies) as page:
+            if self.cache:
+                await self.cache.attach(page)
+            if blocker:
+                stats = await blocker.attach(page, url)
+                self.block_stats.append(stats)
+
+            # Paced inside the page slot: a token taken while queueing for a slot would be
+            # spent by the time the navigation goes out
+            await self.rate_limiter.acquire(url)
+            response = await page.goto(url)
+            if response:
+                self.rate_limiter.feedback(url, response.status, response.headers.get("retry-after"))
+            await page.wait_for_selector("body")
+
+            if custom_function:
+                if asyncio.iscoroutinefunction(custom_function):
+                    await custom_function(page, **custom_function_args)
                 else:
-                    await self.scroller.content_scroll(page)
+                    custom_function(page, **custom_function_args)
+            else:
+                await self.scroller.settle_scroll(page)
+
+            if scope:
+                return await self.outer_html(page, scope)
+            return await page.content()
 
-                content = await page.content()
-                await browser.close()
-                return content
+    async def outer_html(self, page, selector):
+        """Serialises only the element matching `selector` (empty string if absent)."""
+        return await page.evaluate("(selector) => { const el = document.querySelector(selector); return el ? el.outerHTML : ''; }", selector)
 
     async def scrape_with_retry(self, url, insights=True, retries=2, delay=2):
         for attempt in range(retries):
@@ -192,11 +473,33 @@ class AsyncScraper:
                     return None
 
 
-async def format_src(src, url, title=None):
-    soup = BeautifulSoup(src, "html.parser")
+async def format_src(src, url, title=None, pool=None, fingerprints=None):
+    """
+    Parses a page into url/title/content/images. With a FingerprintStore, returns None when
+    the content is unchanged since it was last seen, without extracting the images.
+    """
+    pool = pool or default_pool
+    if fingerprints is None:
+        return await pool.run(parse_src, src, url, title)
+
+    known = fingerprints.get(url)
+    data = await pool.run(parse_src, src, url, title, known)
+    if data is None:
+        fingerprints.record(url, known)
+        return None
+    fingerprints.record(url, fingerprint(data["content"]))
+    return data
+
+
+def parse_src(src, url, title=None, known=None):
+    # `known` is the stored fingerprint of the page's content; if it still matches, the image
+    # extraction is skipped and None is returned.
+    soup = make_soup(src)
 
     if not title:
         title = soup.title.string if soup.title else "No title found"
+    # A NavigableString would drag its whole tree along when returned from a worker process
+    title = str(title) if title is not None else None
     description = soup.find("meta", attrs={"name": "description"})
     description = description["content"] if description else ""
 
@@ -206,12 +509,15 @@ async def format_src(src, url, title=None):
     else:
         all_text = ""
 
+    content = deduplicate_text(all_text)
+    if known is not None and fingerprint(content) == known:
+        return None
+
     base_url = "/".join(url.split("/")[:3])
 
     images = extract_image_data(soup, base_url)
     images = filter_image_urls(images)
 
-    content = deduplicate_text(all_text)
     data = {
         "url": url,
         "title": title,
@@ -268,5 +574,6 @@ def filter_image_urls(image_data):
 
 
 def deduplicate_text(text):
-    sentences = list(set(text.split(". ")))
+    # dict keeps the first occurrence of each sentence in its original position
+    sentences = list(dict.fromkeys(text.split(". ")))
     return ". ".join(sentences)
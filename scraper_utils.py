@@ -3,10 +3,19 @@ import re
 import pandas as pd
 from bs4 import Comment, Declaration, NavigableString, Tag
 
+from parsers import Node
+
 
 def check_months(df, fetch):
+    # `df` is a DataFrame or a batch of ArticleRecords
     months = int(fetch[:-1])
-    min_date = min(df["date"].dropna())
+    if isinstance(df, pd.DataFrame):
+        dates = df["date"].dropna()
+    else:
+        dates = [record.date for record in df if record.date is not None]
+    if len(dates) == 0:
+        return False
+    min_date = min(dates)
     current_date = pd.Timestamp.now()
     days_diff = (current_date - min_date).days
     months_diff = days_diff // 30
@@ -16,20 +25,26 @@ def check_months(df, fetch):
 
 
 def clean(tag):
-    if isinstance(tag, Tag):
+    if isinstance(tag, (Tag, Node)):
         tag = tag.text
     if tag is not None:
         tag = tag.strip()
     return tag
 
 
+# Tags whose direct text is never article content, and class/id fragments marking non-article blocks
+SKIP_TAGS = {"style", "script", "head", "title", "meta", "[document]", "header", "footer", "nav", "sidebar", "aside"}
+SKIP_PATTERN = re.compile("|".join(map(re.escape, ["nav", "menu", "header", "footer", "sidebar", "comment", "widget", "banner", "ad-", "-ad", "social", "share", "related", "recommended", "popular", "trending"])))
+MENU_PATTERN = re.compile(r"^(?:about\s+us|contact(\s+us)?|privacy\s+policy|terms(\s+of\s+service)?|copyright\s+\d{4}|all\s+rights\s+reserved)$")
+
+
 def is_relevant_text(element):
     """
     Determines if an element contains relevant article text while filtering out menus,
     headers, footers, and other non-content elements.
     """
     # Skip hidden elements and special tags
-    if element.parent.name in {"style", "script", "head", "title", "meta", "[document]", "header", "footer", "nav", "sidebar", "aside"}:
+    if element.parent.name in SKIP_TAGS:
         return False
 
     # Skip comments and declarations
@@ -37,47 +52,58 @@ def is_relevant_text(element):
         return False
 
     # Check if element is in a common navigation/footer class/id
-    parent_classes = []
-    parent_ids = []
     parent = element.parent
-
     while parent and parent.name != "[document]":
-        if parent.get("class"):
-            parent_classes.extend(parent["class"])
-        if parent.get("id"):
-            parent_ids.append(parent["id"])
-        parent = parent.parent
-
-    # Common class/id patterns for non-article content
-    skip_patterns = ["nav", "menu", "header", "footer", "sidebar", "comment", "widget", "banner", "ad-", "-ad", "social", "share", "related", "recommended", "popular", "trending"]
-
-    for pattern in skip_patterns:
-        if any(pattern in str(class_).lower() for class_ in parent_classes):
-            return False
-        if any(pattern in str(id_).lower() for id_ in parent_ids):
+        if is_skipped_tag(parent):
             return False
+        parent = parent.parent
 
     # Process text content
     if isinstance(element, NavigableString):
         text = str(element).strip()
 
-        # Skip empty or very short texts
-        if not text or len(text) < 50:
-            return False
-
-        # Skip whitespace-only text
-        if re.match(r"^\s*$", text):
+        # Skip empty, whitespace-only or very short texts
+        if len(text) < 50:
             return False
 
         # Skip common menu/footer text patterns
-        menu_patterns = [r"^about\s+us$", r"^contact(\s+us)?$", r"^privacy\s+policy$", r"^terms(\s+of\s+service)?$", r"^copyright\s+\d{4}$", r"^all\s+rights\s+reserved$"]
-
-        if any(re.match(pattern, text.lower()) for pattern in menu_patterns):
+        if MENU_PATTERN.match(text.lower()):
             return False
 
     return True
 
 
+def is_skipped_tag(tag):
+    """True if the tag's classes or id mark it as navigation, footer, ads or similar."""
+    classes = tag.get("class")
+    if classes and any(SKIP_PATTERN.search(str(class_).lower()) for class_ in classes):
+        return True
+    id_ = tag.get("id")
+    return bool(id_) and SKIP_PATTERN.search(str(id_).lower()) is not None
+
+
+def relevant_strings(root):
+    """
+    Yields the stripped article strings under `root` in document order, walking the tree once.
+    A tag matched by `is_skipped_tag` is pruned with its whole subtree; the remaining strings
+    get the same checks as `is_relevant_text`.
+    """
+    stack = [iter(root.contents)]
+    while stack:
+        element = next(stack[-1], None)
+        if element is None:
+            stack.pop()
+        elif isinstance(element, Tag):
+            if not is_skipped_tag(element):
+                stack.append(iter(element.contents))
+        elif isinstance(element, NavigableString):
+            if element.parent.name in SKIP_TAGS or isinstance(element, (Comment, Declaration)):
+                continue
+            text = element.strip()
+            if len(text) >= 50 and not MENU_PATTERN.match(text.lower()):
+                yield text
+
+
 def extract_article_text(soup):
     """
     Extracts the main article text content from a BeautifulSoup object while
@@ -99,8 +125,47 @@ def extract_article_text(soup):
     if not main_content:
         main_content = soup
 
-    # Extract visible text from main content
-    texts = main_content.findAll(string=True)
-    relevant_texts = filter(is_relevant_text, texts)
+    # Classes and ids above the main content apply to every string inside it
+    parent = main_content
+    while parent is not None and parent.name != "[document]":
+        if is_skipped_tag(parent):
+            return ""
+        parent = parent.parent
+
+    return " ".join(relevant_strings(main_content))
+
+
+class CardTracker:
+    """
+    Reads only the cards appended to a live page since the previous call, so that
+    "show more" loops serialise and parse each card once instead of the whole DOM per click.
+    Cards are tracked by position and de-duplicated on `key` in case the list is re-rendered.
+    """
 
-    return " ".join(text.strip() for text in relevant_texts)
+    def __init__(self, selector, key="link"):
+        self.selector = selector
+        self.key = key
+        self.count = 0
+        self.seen = set()
+
+    async def new_cards(self, page):
+        total, cards = await page.eval_on_selector_all(
+            self.selector,
+            "(els, start) => [els.length, els.slice(els.length < start ? 0 : start).map((el) => el.outerHTML)]",
+            self.count,
+        )
+        self.count = total
+        return "".join(cards)
+
+    def fresh(self, items):
+        if isinstance(items, pd.DataFrame):
+            items = items[~items[self.key].isin(self.seen)]
+            self.seen.update(items[self.key])
+            return items
+
+        new = []
+        for item in items:
+            if item[self.key] not in self.seen:
+                self.seen.add(item[self.key])
+                new.append(item)
+        return new
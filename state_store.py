@@ -0,0 +1,95 @@
+import json
+import os
+
+import pandas as pd
+
+
+class StateStore:
+    """
+    Persists, per source, the newest link and date seen so far plus a bounded set of recently
+    seen links. `fetch="new"` crawls stop on the first page made only of known items: links in
+    the set, or anything dated before the stored high-water mark. A source without state is
+    treated as fully known, so its first incremental run fetches a single page and seeds it.
+    """
+
+    def __init__(self, path="state.json", max_known=2000):
+        self.path = path
+        self.max_known = max_known
+        self.sources = None
+
+    def load(self):
+        if self.sources is None:
+            try:
+                with open(self.path) as file:
+                    self.sources = json.load(file)
+            except FileNotFoundError:
+                self.sources = {}
+        return self.sources
+
+    def save(self):
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w") as file:
+            json.dump(self.load(), file, indent=2)
+        os.replace(tmp, self.path)
+
+    def get(self, source):
+        return self.load().get(source)
+
+    def unseen(self, source, posts):
+        """Filters `posts` (a DataFrame, or a list of ArticleRecords / dicts) down to the items not seen before."""
+        state = self.get(source)
+        if not isinstance(posts, pd.DataFrame):
+            return posts if state is None else self.unseen_items(state, posts)
+        if state is None or posts.empty:
+            return posts
+
+        new = ~posts["link"].isin(set(state["known"]))
+        if state["date"] and "date" in posts.columns:
+            dates = pd.to_datetime(posts["date"], errors="coerce")
+            new &= dates.isna() | (dates >= pd.Timestamp(state["date"]))
+        return posts[new]
+
+    def unseen_items(self, state, posts):
+        known = set(state["known"])
+        since = pd.Timestamp(state["date"]) if state["date"] else None
+        fresh = []
+        for item in posts:
+            if item.get("link") in known:
+                continue
+            date = pd.to_datetime(item.get("date"), errors="coerce") if since is not None else None
+            if date is not None and not pd.isna(date) and date < since:
+                continue
+            fresh.append(item)
+        return fresh
+
+    def is_known(self, source, posts):
+        if self.get(source) is None:
+            return True
+        return len(self.unseen(source, posts)) == 0
+
+    def record(self, source, posts, fetch):
+        """Updates the source's state with `posts`; for `fetch="new"` returns only the unseen ones."""
+        if fetch == "new":
+            posts = self.unseen(source, posts)
+        if posts.empty:
+            return posts
+
+        state = self.get(source) or {"link": None, "date": None, "known": []}
+        if "date" in posts.columns:
+            dates = pd.to_datetime(posts["date"], errors="coerce").reset_index(drop=True)
+            if dates.notna().any():
+                newest = dates.idxmax()
+                if state["date"] is None or dates[newest] >= pd.Timestamp(state["date"]):
+                    state["date"] = dates[newest].isoformat()
+                    state["link"] = posts["link"].iloc[newest]
+        elif state["link"] is None:
+            state["link"] = posts["link"].iloc[0]
+
+        known = set(state["known"])
+        state["known"] = ([link for link in posts["link"] if link not in known] + state["known"])[: self.max_known]
+        self.load()[source] = state
+        self.save()
+        return posts
+
+
+default_store = StateStore()
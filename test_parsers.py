@@ -0,0 +1,59 @@
+import pytest
+
+pytest.importorskip("bs4")
+pytest.importorskip("pandas")
+
+from baker_tilly import parse_cards as baker_tilly_cards
+from bdo import parse_cards as bdo_cards
+from bench_fixtures import load_fixtures
+from cbh import CBH
+from cbh import parse_cards as cbh_cards
+from cohn_reznick import CohnReznick
+from cohn_reznick import parse_cards as cohn_reznick_cards
+from grant_thornton import parse_cards as grant_thornton_cards
+from marcum import Marcum
+from marcum import parse_cards as marcum_cards
+from parsers import available_parsers, make_tree, use_parser
+from plante_moran import parse_cards as plante_moran_cards
+from prager_metis import PragerMetis
+from prager_metis import parse_cards as prager_metis_cards
+from pwc import parse_table as pwc_table
+from records import ArticleRecord
+
+EXTRACTORS = {
+    ("baker_tilly", "listing"): baker_tilly_cards,
+    ("bdo", "listing"): bdo_cards,
+    ("cbh", "listing"): lambda content: cbh_cards(content, CBH().scope),
+    ("cohn_reznick", "listing"): lambda content: cohn_reznick_cards(content, CohnReznick().scope),
+    ("grant_thornton", "listing"): grant_thornton_cards,
+    ("marcum", "listing"): lambda content: marcum_cards(content, Marcum().scope),
+    ("plante_moran", "listing"): plante_moran_cards,
+    ("prager_metis", "listing"): lambda content: prager_metis_cards(content, PragerMetis().scope),
+    ("pwc", "table"): pwc_table,
+}
+
+
+def normalize(items):
+    return [item.as_dict() if isinstance(item, ArticleRecord) else item for item in items]
+
+
+@pytest.mark.parametrize("parser", available_parsers())
+@pytest.mark.parametrize("source, kind", sorted(EXTRACTORS))
+def test_listing_parity(source, kind, parser):
+    extract = EXTRACTORS[source, kind]
+    _, fixtures = load_fixtures(source)
+    for name, content in fixtures[kind]:
+        with use_parser(listing="html.parser"):
+            expected = normalize(extract(content))
+        with use_parser(listing=parser):
+            assert normalize(extract(content)) == expected, name
+        assert expected, name
+
+
+@pytest.mark.parametrize("parser", available_parsers())
+def test_multi_word_class_whitespace(parser):
+    content = '<div class="card  featured\nwide">one</div><div class="card">two</div><div class="featured card wide">three</div>'
+    with use_parser(listing=parser):
+        tree = make_tree(content)
+        assert [node.text for node in tree.find_all("div", {"class": "card featured wide"})] == ["one"]
+        assert [node.text for node in tree.find_all("div", {"class": "card"})] == ["one", "two", "three"]
@@ -0,0 +1,53 @@
+import asyncio
+
+import pytest
+
+from pipeline import ArticlePipeline
+
+
+async def fetch(link):
+    await asyncio.sleep(0)
+    return f"body {link}"
+
+
+def test_stream_yields_every_link():
+    async def run():
+        pipeline = ArticlePipeline(fetch, workers=2, queue_size=1)
+        return sorted([item async for item in pipeline.stream(range(10))])
+
+    assert asyncio.run(run()) == [(i, f"body {i}") for i in range(10)]
+
+
+def test_closing_early_returns():
+    async def run():
+        stream = ArticlePipeline(fetch, workers=2, queue_size=1).stream(range(100))
+        async for _ in stream:
+            break
+        await stream.aclose()
+
+    asyncio.run(asyncio.wait_for(run(), 5))
+
+
+def test_error_in_consumer_returns():
+    async def run():
+        stream = ArticlePipeline(fetch, workers=2, queue_size=1).stream(range(100))
+        try:
+            async for _ in stream:
+                raise ValueError("consumer failed")
+        finally:
+            await stream.aclose()
+
+    with pytest.raises(ValueError):
+        asyncio.run(asyncio.wait_for(run(), 5))
+
+
+def test_failing_links_are_raised():
+    async def links():
+        yield 1
+        raise RuntimeError("listing failed")
+
+    async def run():
+        return [item async for item in ArticlePipeline(fetch, workers=2, queue_size=1).stream(links())]
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(asyncio.wait_for(run(), 5))
@@ -1,59 +1,69 @@
 import re
 from typing import Literal
 
-import pandas as pd
-import requests
-
+from date_filter import WordPressDateFilter, window_start
+from http_client import AsyncHTTPClient
+from records import ArticleRecord, collect, parse_date
 from scraper_utils import check_months
+from state_store import default_store
 
 
 class Withum:
-    def __init__(self):
+    def __init__(self, client=None):
+        self.name = "withum"
         self.url = "https://www.withum.com/resources/?category_filter=71,63,84,73"
         self.api_url = "https://www.withum.com/wp-json/wp/v2/posts?_embed=true&page={}&per_page=20&_fields=author,id,excerpt,title,link,featured_media,_links,_embedded,post_authors&tax_relation=AND&category_filter=71,63,84,73"
         self.search_url = "https://www.withum.com/wp-json/wp/v2/posts?_embed=true&page=1&per_page=6&_fields=author%2Cid%2Cexcerpt%2Ctitle%2Clink%2Cfeatured_media%2C_links%2C_embedded%2Cpost_authors&tax_relation=AND&category_filter=71%2C63%2C84%2C73&s_filter=finance"
-        self.session = requests.Session()
-        self.session.headers.update({"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"})
+        self.state = default_store
+        self.date_filter = WordPressDateFilter()
+        self.client = client or AsyncHTTPClient()
+
+    async def stream(self, fetch: Literal["first", "6m", "12m", "all", "new"] = "first"):
+        """Yields a list of ArticleRecords per API page."""
+        async with self.client:
+            async for batch in self.get_posts(fetch):
+                yield batch
 
-    def get_posts(self, fetch):
-        posts, count = [], 0
+    async def get_posts(self, fetch):
         page = 1
+        since = window_start(fetch)
+        api_url = self.api_url + self.date_filter.query(since) if since is not None else self.api_url
 
         while True:
-            response = self.session.get(self.api_url.format(page))
+            response = await self.client.get(api_url.format(page))
 
-            if response.status_code != 200:
-                return posts
-            df = self.make_df(response)
-            posts.append(df)
-            count += len(df)
+            if response.status != 200:
+                return
+            records = self.make_records(response)
+            batch = self.date_filter.apply(records, since)
+            yield batch
 
             if fetch == "first":
                 break
-            elif fetch == "all":
-                if not len(df):
+            elif fetch == "all" or (since is not None and self.date_filter.pushdown):
+                if not records:
+                    break
+            elif fetch == "new":
+                if self.state.is_known(self.name, batch):
                     break
             elif re.match(r"\b\d{1,2}m\b", fetch):
-                if check_months(df, fetch):
+                if check_months(records, fetch):
                     break
             else:
                 break
-        page += 1
-        return posts
+            page += 1
 
-    def make_df(self, response):
+    def make_records(self, response):
         posts = []
         for post in response.json():
-            posts.append({"title": post["title"]["rendered"], "link": post["link"], "date": post["_embedded"]["wp:featuredmedia"][0]["date"]})
-
-        df = pd.DataFrame(posts)
-        df["date"] = pd.to_datetime(df["date"], format="%Y-%m-%dT%H:%M:%S")
-        return df
+            date = parse_date(post["_embedded"]["wp:featuredmedia"][0]["date"], "%Y-%m-%dT%H:%M:%S")
+            posts.append(ArticleRecord(link=post["link"], title=post["title"]["rendered"], date=date))
+        return posts
 
-    def execute(self, fetch: Literal["first", "6m", "12m", "all"] = "first"):
+    async def execute(self, fetch: Literal["first", "6m", "12m", "all", "new"] = "first"):
         print(f"---{self.url}", end="---")
-        posts = self.get_posts(fetch)
-        posts = pd.concat(posts)
+        posts = await collect(self.stream(fetch))
+        posts = self.state.record(self.name, posts, fetch)
         posts = posts.sort_values(by="date", ascending=False)
         print(len(posts))
         return posts